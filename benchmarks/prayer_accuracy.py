@@ -0,0 +1,429 @@
+"""
+Точность и скорость движка расчета времен намаза на эталонных расписаниях.
+
+Эталоны лежат в benchmarks/fixtures (CSV, можно .csv.gz): одна строка -
+город, настройки расчета, дата и семь местных времен ЧЧ:ММ[:СС].
+Города раздаются процессам пула, каждый считает свои дни тем же
+compute_prayer_times, что и таблица времен на экране, и возвращает
+отклонения. Отчет по каждому файлу эталона - гистограммы отклонений
+по каждому времени и скорость в днях в секунду.
+
+Прогон завершается с кодом 1, если отклонение превышает допуск или
+скорость упала относительно сохраненного базового отчета:
+    python -m benchmarks.prayer_accuracy --json build/accuracy.json
+    python -m benchmarks.prayer_accuracy --baseline build/accuracy.json
+
+Поставляемые эталоны:
+    spa-2025.csv.gz - независимая эфемерида: NREL SPA (Reda, Andreas 2004,
+        полный ряд VSOP87 и нутация) из pvlib, момент каждого события
+        находится бисекцией по высоте солнца. Общих с движком формул
+        положения солнца нет, только определения событий и правила
+        высоких широт.
+    self-consistency-2025.csv.gz - проверка самосогласованности: тот же
+        ряд положения солнца, что в движке, но каждое событие уточняется
+        в свой собственный момент. Ловит ошибки приближения движка, но
+        не ошибки самой эфемериды.
+
+Эталоны строятся только в явно заданный файл и не перезаписываются
+без --force, чтобы прогон не мог сам себе обновить эталон:
+    python -m benchmarks.prayer_accuracy fixtures --kind spa -o build/spa-2025.csv.gz
+Опубликованные расписания в том же формате кладутся в каталог рядом.
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from logic.prayer_times import (
+    ASR_FACTORS, CALCULATION_METHODS, PRAYER_KEYS, UNIX_EPOCH_JD, compute_prayer_times, to_days
+)
+from logic.solar_ephemeris import sun_position_series
+from logic.timezones import SECONDS_PER_DAY, zone_offsets
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+# Столбцы эталона
+SETTINGS_COLUMNS = ('latitude', 'longitude', 'elevation', 'timezone', 'method', 'madhab')
+FIXTURE_COLUMNS = ('name',) + SETTINGS_COLUMNS + ('date',) + PRAYER_KEYS
+
+# Границы корзин гистограммы отклонений, минуты
+HISTOGRAM_EDGES = (-np.inf, -2.0, -1.0, -0.5, -0.25, 0.25, 0.5, 1.0, 2.0, np.inf)
+
+# Наибольшее допустимое отклонение, минуты (эталоны публикуются с точностью до минуты)
+MAX_ERROR = 1.0
+
+# Допустимое падение скорости относительно базового отчета
+SPEED_TOLERANCE = 0.25
+
+def reference_times(days, latitude, longitude, elevation, zone, method, madhab, iterations=5):
+    """
+    Эталонные времена: итерационное решение для каждого события
+
+    Args:
+        zone (OffsetTable): Таблица смещений пояса
+
+    Returns:
+        np.ndarray: Матрица (дни, 7) в минутах от местной полуночи
+    """
+    params = CALCULATION_METHODS[method]
+    day_numbers = to_days(days)[:, None]
+    phi = np.radians(latitude)
+    sunrise_angle = 0.833 + 0.0347 * np.sqrt(elevation)
+
+    # İmsak, Günəş, Günorta, İkindi, Axşam, Gecə: сторона от полудня
+    signs = np.array([-1.0, -1.0, 0.0, 1.0, 1.0, 1.0])
+    hours = 12.0 - longitude / 15.0 + 6.0 * signs + np.zeros(day_numbers.shape)
+    for _ in range(iterations):
+        declination, eqt = sun_position_series(day_numbers + UNIX_EPOCH_JD + hours / 24.0)
+        delta = np.radians(declination)
+        noon = 12.0 - longitude / 15.0 - eqt
+
+        # Высота солнца в момент каждого события (для Günorta не нужна)
+        shadow = np.degrees(np.arctan(1.0 / (ASR_FACTORS[madhab] + np.tan(np.abs(phi - delta)))))
+        altitude = np.array([-params['fajr'], -sunrise_angle, 0.0, 0.0, -sunrise_angle, -params.get('isha', 0.0)])
+        altitude = np.where(np.arange(6) == 3, shadow, altitude)
+        cos_h = (np.sin(np.radians(altitude)) - np.sin(phi) * np.sin(delta)) / (np.cos(phi) * np.cos(delta))
+        with np.errstate(invalid='ignore'):
+            hour_angle = np.degrees(np.arccos(cos_h)) / 15.0
+        hour_angle[:, 2] = 0.0
+        # Недостижимая высота: момент уточнения остается прежним, событие - NaN
+        events = noon + signs * hour_angle
+        hours = np.where(np.isnan(events), hours, events)
+
+    fajr, sunrise, dhuhr, asr, sunset, isha = events.T
+    return _local_times(day_numbers, (fajr, sunrise, dhuhr, asr, sunset, isha), params, zone)
+
+def _local_times(day_numbers, events, params, zone):
+    """
+    Правила высоких широт и Təhəccüd из определения методов, затем
+    перевод моментов UTC (часы от полуночи дня) в местные минуты
+
+    Returns:
+        np.ndarray: Матрица (дни, 7) в минутах от местной полуночи
+    """
+    fajr, sunrise, dhuhr, asr, sunset, isha = events
+    if 'isha_minutes' in params:
+        isha = sunset + params['isha_minutes'] / 60.0
+
+    night = sunrise + 24.0 - sunset
+    fajr_limit = sunrise - params['fajr'] / 60.0 * night
+    fajr = np.where(np.isnan(fajr) | (fajr < fajr_limit), fajr_limit, fajr)
+    if 'isha_minutes' not in params:
+        isha_limit = sunset + params['isha'] / 60.0 * night
+        isha = np.where(np.isnan(isha) | (isha > isha_limit), isha_limit, isha)
+    tahajjud = fajr - (fajr + 24.0 - sunset) / 3.0
+
+    times = np.stack([tahajjud, fajr, sunrise, dhuhr, asr, sunset, isha], axis=1)
+    instants = day_numbers * SECONDS_PER_DAY + np.nan_to_num(times) * 3600.0
+    return ((times + zone.offsets_at(instants) / 3600.0) % 24.0) * 60.0
+
+# ΔT = TT - UT для эфемериды SPA в 2025 году, секунды
+SPA_DELTA_T = 69.2
+
+def spa_times(days, latitude, longitude, elevation, zone, method, madhab, iterations=40):
+    """
+    Эталонные времена по независимой эфемериде NREL SPA (pvlib)
+
+    Полдень - момент, где уравнение времени SPA согласовано с самим
+    моментом. Остальные события - бисекция геометрической высоты
+    солнца между полночью и полднем (утренние) или полднем и
+    следующей полночью (вечерние): на этих отрезках высота монотонна.
+    Угол İkindi берется по высоте солнца в полдень.
+
+    Returns:
+        np.ndarray: Матрица (дни, 7) в минутах от местной полуночи
+    """
+    try:
+        from pvlib import spa
+    except ImportError:
+        raise SystemExit("Для эталона SPA нужен pvlib: pip install pvlib")
+
+    params = CALCULATION_METHODS[method]
+    day_numbers = to_days(days)[:, None]
+
+    def altitude(hours):
+        instants = (day_numbers * SECONDS_PER_DAY + hours * 3600.0).ravel()
+        # e0 - топоцентрическая высота без рефракции (рефракция входит в углы событий)
+        result = spa.solar_position(instants, latitude, longitude, 0.0, 1013.25, 12.0,
+                                    SPA_DELTA_T, 0.5667, numthreads=1)
+        return result[3].reshape(hours.shape), result[5].reshape(hours.shape)
+
+    noon = 12.0 - longitude / 15.0 + np.zeros(day_numbers.shape)
+    for _ in range(3):
+        noon_altitude, eqt = altitude(noon)
+        noon = 12.0 - longitude / 15.0 - eqt / 60.0
+    noon_altitude, _ = altitude(noon)
+
+    # İmsak, Günəş, İkindi, Axşam, Gecə: целевая высота и сторона от полудня
+    sunrise_angle = 0.833 + 0.0347 * np.sqrt(elevation)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shadow = np.degrees(np.arctan(1.0 / (ASR_FACTORS[madhab] + 1.0 / np.tan(np.radians(noon_altitude)))))
+    shadow = np.where(noon_altitude > 0.0, shadow, np.nan)
+    targets = np.hstack([
+        np.full(noon.shape, -params['fajr']), np.full(noon.shape, -sunrise_angle), shadow,
+        np.full(noon.shape, -sunrise_angle), np.full(noon.shape, -params.get('isha', 0.0))
+    ])
+    side = np.array([-1.0, -1.0, 1.0, 1.0, 1.0])
+    near = np.repeat(noon, 5, axis=1)
+    far = near + 12.0 * side
+
+    near_altitude, _ = altitude(near)
+    far_altitude, _ = altitude(far)
+    # Высота не пересекается на отрезке: события нет (белые ночи, полярный день)
+    missing = (near_altitude < targets) | (far_altitude > targets) | np.isnan(targets)
+    for _ in range(iterations):
+        middle = (near + far) / 2.0
+        above = altitude(middle)[0] >= targets
+        near = np.where(above, middle, near)
+        far = np.where(above, far, middle)
+    events = np.where(missing, np.nan, (near + far) / 2.0)
+
+    fajr, sunrise, asr, sunset, isha = events.T
+    return _local_times(day_numbers, (fajr, sunrise, noon[:, 0], asr, sunset, isha), params, zone)
+
+def format_seconds(minutes):
+    """ЧЧ:ММ:СС для минут от полуночи (пусто для NaN)"""
+    if np.isnan(minutes):
+        return ''
+    total = int(round(float(minutes) * 60.0)) % SECONDS_PER_DAY
+    return f"{total // 3600:02d}:{total // 60 % 60:02d}:{total % 60:02d}"
+
+def parse_time(text):
+    """Минуты от полуночи из ЧЧ:ММ или ЧЧ:ММ:СС (NaN для пустой строки)"""
+    if not text:
+        return np.nan
+    parts = [int(part) for part in text.split(':')]
+    return parts[0] * 60.0 + parts[1] + (parts[2] / 60.0 if len(parts) > 2 else 0.0)
+
+# Построители эталонов для команды fixtures
+FIXTURE_KINDS = {
+    'spa': spa_times,
+    'self-consistency': reference_times,
+}
+
+def write_fixture(path, kind='spa', cities_path='data/cities.csv', year=2025, step=7):
+    """
+    Эталон для городов справочника: каждый step-й день года,
+    методы и мазхабы чередуются по городам
+
+    Args:
+        kind (str): Построитель из FIXTURE_KINDS
+
+    Returns:
+        int: Число строк (город-дней)
+    """
+    days = np.arange(np.datetime64(f'{year}-01-01'), np.datetime64(f'{year + 1}-01-01'), step)
+    methods = tuple(CALCULATION_METHODS)
+    madhabs = tuple(ASR_FACTORS)
+    rows = 0
+    with open(cities_path, newline='', encoding='utf-8') as source, \
+            gzip.open(path, 'wt', newline='', encoding='utf-8') as target:
+        writer = csv.writer(target)
+        writer.writerow(FIXTURE_COLUMNS)
+        for number, city in enumerate(csv.DictReader(source)):
+            method = methods[number % len(methods)]
+            madhab = madhabs[number // len(methods) % len(madhabs)]
+            latitude, longitude = float(city['latitude']), float(city['longitude'])
+            elevation = max(float(city['elevation'] or 0), 0.0)
+            zone = zone_offsets(city['timezone'], year, year)
+            times = FIXTURE_KINDS[kind](days, latitude, longitude, elevation, zone, method, madhab)
+            for day, row in zip(days, times):
+                writer.writerow(
+                    (city['name'], city['latitude'], city['longitude'], elevation,
+                     city['timezone'], method, madhab, str(day))
+                    + tuple(format_seconds(minutes) for minutes in row)
+                )
+                rows += 1
+    return rows
+
+def read_fixtures(paths):
+    """
+    Эталоны, сгруппированные по настройкам расчета
+
+    Returns:
+        list: Задания (имя, настройки, даты, эталонная матрица (дни, 7))
+    """
+    groups = {}
+    for path in paths:
+        opener = gzip.open if str(path).endswith('.gz') else open
+        with opener(path, 'rt', newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                key = (row['name'],) + tuple(row[column] for column in SETTINGS_COLUMNS)
+                dates, references = groups.setdefault(key, ([], []))
+                dates.append(row['date'])
+                references.append([parse_time(row[prayer]) for prayer in PRAYER_KEYS])
+
+    tasks = []
+    for (name, latitude, longitude, elevation, timezone, method, madhab), (dates, references) in groups.items():
+        settings = {
+            'latitude': float(latitude),
+            'longitude': float(longitude),
+            'elevation': float(elevation or 0),
+            'utc_offset': 0.0,
+            'timezone': timezone,
+            'method': method,
+            'madhab': madhab
+        }
+        tasks.append((name, settings, np.array(dates, dtype='datetime64[D]'), np.array(references)))
+    return tasks
+
+def check_city(task):
+    """
+    Отклонения движка от эталона для одного города (выполняется в процессе пула)
+
+    Returns:
+        tuple: (имя, отклонения (дни, 7) в минутах, время расчета в секундах)
+    """
+    name, settings, days, references = task
+    started = time.perf_counter()
+    times = compute_prayer_times(days, **settings)
+    elapsed = time.perf_counter() - started
+    errors = (times - references + 720.0) % 1440.0 - 720.0
+    return name, errors, elapsed
+
+def run(paths, workers=None):
+    """
+    Прогон всех эталонов
+
+    Returns:
+        dict: Отчет (см. format_report)
+    """
+    tasks = read_fixtures(paths)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        results = list(executor.map(check_city, tasks, chunksize=8))
+    wall = time.perf_counter() - started
+
+    errors = np.concatenate([result[1] for result in results])
+    engine_seconds = sum(result[2] for result in results)
+    prayers = {}
+    for column, prayer in enumerate(PRAYER_KEYS):
+        values = errors[:, column]
+        # Только дни, где и движок, и эталон дают время
+        values = values[~np.isnan(values)]
+        absolute = np.abs(values)
+        prayers[prayer] = {
+            'count': int(len(values)),
+            'mean': float(values.mean()) if len(values) else 0.0,
+            'p95': float(np.percentile(absolute, 95)) if len(values) else 0.0,
+            'max': float(absolute.max()) if len(values) else 0.0,
+            'histogram': np.bincount(
+                np.searchsorted(HISTOGRAM_EDGES[1:-1], values, side='right'),
+                minlength=len(HISTOGRAM_EDGES) - 1
+            ).tolist()
+        }
+
+    days = len(errors)
+    return {
+        'cities': len(tasks),
+        'days': days,
+        'wall_seconds': wall,
+        'days_per_second': days / wall,
+        'engine_days_per_second': days / engine_seconds,
+        'prayers': prayers
+    }
+
+def format_report(report):
+    """Текст отчета: таблица отклонений, гистограммы и скорость"""
+    labels = [
+        f"{'<' if np.isinf(low) else ''}{high if np.isinf(low) else low:+g}"
+        + ('' if np.isinf(low) or np.isinf(high) else f"..{high:+g}")
+        + ('>' if np.isinf(high) else '')
+        for low, high in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:])
+    ]
+    lines = [f"{report['cities']} городов, {report['days']} город-дней"]
+    lines.append(f"{'':10}{'среднее':>9}{'p95':>8}{'макс':>8}  (минуты)")
+    for prayer, stats in report['prayers'].items():
+        lines.append(f"{prayer:10}{stats['mean']:+9.3f}{stats['p95']:8.3f}{stats['max']:8.3f}")
+    for prayer, stats in report['prayers'].items():
+        lines.append(f"{prayer}:")
+        total = max(stats['count'], 1)
+        for label, count in zip(labels, stats['histogram']):
+            bar = '#' * int(round(40 * count / total))
+            lines.append(f"  {label:>12} {count:7d} {bar}")
+    lines.append(
+        f"{report['days_per_second']:.0f} дней/с (пул, {report['wall_seconds']:.2f} с), "
+        f"{report['engine_days_per_second']:.0f} дней/с на процесс"
+    )
+    return '\n'.join(lines)
+
+def regressions(report, baseline=None, max_error=MAX_ERROR, speed_tolerance=SPEED_TOLERANCE):
+    """
+    Нарушения допусков
+
+    Returns:
+        list: Сообщения (пусто - прогон пройден)
+    """
+    failures = []
+    for prayer, stats in report['prayers'].items():
+        if stats['max'] > max_error:
+            failures.append(f"{prayer}: отклонение {stats['max']:.3f} мин больше {max_error:g}")
+        if baseline is not None:
+            previous = baseline['prayers'][prayer]['max']
+            if stats['max'] > max(previous * 1.1, previous + 0.05):
+                failures.append(f"{prayer}: отклонение выросло с {previous:.3f} до {stats['max']:.3f} мин")
+    if baseline is not None:
+        previous = baseline['engine_days_per_second']
+        if report['engine_days_per_second'] < previous * (1.0 - speed_tolerance):
+            failures.append(
+                f"скорость упала с {previous:.0f} до {report['engine_days_per_second']:.0f} дней/с"
+            )
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Точность и скорость расчета времен намаза")
+    parser.add_argument('command', nargs='?', choices=('run', 'fixtures'), default='run')
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR, help="Каталог эталонов")
+    parser.add_argument('--workers', type=int, default=None, help="Число процессов (по умолчанию все ядра)")
+    parser.add_argument('--max-error', type=float, default=MAX_ERROR, help="Допуск отклонения, минуты")
+    parser.add_argument('--baseline', type=Path, default=None, help="Базовый отчет JSON для сравнения")
+    parser.add_argument('--json', type=Path, default=None, help="Куда записать отчет JSON")
+    parser.add_argument('--kind', choices=tuple(FIXTURE_KINDS), default='spa', help="Построитель эталона")
+    parser.add_argument('-o', '--output', type=Path, default=None, help="Файл нового эталона (.csv.gz)")
+    parser.add_argument('--force', action='store_true', help="Перезаписать существующий эталон")
+    args = parser.parse_args(argv)
+
+    if args.command == 'fixtures':
+        if args.output is None:
+            parser.error("для fixtures нужен -o ПУТЬ")
+        if args.output.exists() and not args.force:
+            parser.error(f"{args.output} уже существует (--force - перезаписать)")
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        print(f"{write_fixture(args.output, args.kind)} город-дней -> {args.output}")
+        return 0
+
+    paths = sorted(args.fixtures.glob('*.csv')) + sorted(args.fixtures.glob('*.csv.gz'))
+    if not paths:
+        print(f"Нет эталонов в {args.fixtures}")
+        return 1
+
+    # Каждый эталон - отдельный отчет: независимый и самосогласованный не смешиваются
+    reports = {}
+    for path in paths:
+        reports[path.name] = run([path], args.workers)
+        print(f"== {path.name}")
+        print(format_report(reports[path.name]))
+
+    if args.json is not None:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(reports, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    baseline = {}
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    failures = []
+    for name, report in reports.items():
+        failures.extend(
+            f"{name}: {failure}" for failure in regressions(report, baseline.get(name), args.max_error)
+        )
+    for failure in failures:
+        print(f"РЕГРЕССИЯ: {failure}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
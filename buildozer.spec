@@ -13,7 +13,7 @@ package.domain = orrstudio.github.io
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,png,jpg,kv,atlas,ttf,mp3
+source.include_exts = py,png,jpg,kv,atlas,ttf,mp3,bin
 
 # (list) List of inclusions using pattern matching
 source.include_patterns = assets/*,images/*,fonts/*,audio/*,icons/*
@@ -22,7 +22,7 @@ source.include_patterns = assets/*,images/*,fonts/*,audio/*,icons/*
 #source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-#source.exclude_dirs = tests, bin, venv
+source.exclude_dirs = tests
 
 # (list) List of exclusions using pattern matching
 # Do not prefix with './'
@@ -37,7 +37,7 @@ version = 1.0.0
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy
+requirements = python3,kivy,numpy,tzdata
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
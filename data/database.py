@@ -1,8 +1,18 @@
 # data/database.py
 from pathlib import Path
 import sqlite3
-from logic.display_utils import is_mobile_device, find_current_monitor, get_monitor_info
-from kivy.core.window import Window
+
+# Настройки расчета времен намаза по умолчанию
+DEFAULT_CALCULATION_SETTINGS = {
+    'latitude': '40.4093',
+    'longitude': '49.8671',
+    'elevation': '0',
+    'utc_offset': '4',
+    'timezone': '',  # Пояс IANA (пусто - постоянное смещение utc_offset; задается командой location)
+    'method': 'MWL',
+    'madhab': 'standard',
+    'offsets': '0,0,0,0,0,0,0'  # Поправки в минутах для каждого из 7 времен
+}
 
 class SettingsDatabase:
     def __init__(self, db_path='data/settings.db'):
@@ -28,6 +38,28 @@ class SettingsDatabase:
             VALUES ('color', 'lime')
         """)
         
+        # Календарь хиджры: tabular (арифметический) или sighting (по видимости серпа)
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO settings (key, value) 
+            VALUES ('hijri_calendar', 'tabular')
+        """)
+        
+        # Звуки: файл азана (пусто - без азана), напоминание за N минут (0 - нет), бой часов
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO settings (key, value) 
+            VALUES (?, ?)
+        """, (
+            ('adhan_sound', 'audio/adhan/AdhanMisharyRashidAlafasy.mp3'),
+            ('reminder_minutes', '10'),
+            ('hourly_chime', '0')
+        ))
+        
+        # Значения по умолчанию для расчета времен намаза (Баку)
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO settings (key, value) 
+            VALUES (?, ?)
+        """, DEFAULT_CALCULATION_SETTINGS.items())
+        
         # Создаем таблицу для хранения параметров окна, если она не существует
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS window_settings (
@@ -39,6 +71,26 @@ class SettingsDatabase:
             )
         ''')
         
+        # Кэш рассчитанных времен намаза
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS prayer_times (
+                date TEXT NOT NULL,
+                location TEXT NOT NULL,
+                method TEXT NOT NULL,
+                madhab TEXT NOT NULL,
+                offsets TEXT NOT NULL,
+                times TEXT NOT NULL,
+                PRIMARY KEY (date, location, method, madhab, offsets)
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_prayer_times_date 
+            ON prayer_times (date)
+        ''')
+        
+        # Размеры макета больше не сохраняются (формулы дешевле запроса)
+        self.cursor.execute('DROP TABLE IF EXISTS layout_metrics')
+        
         self.connection.commit()
 
     def get_setting(self, key):
@@ -55,6 +107,66 @@ class SettingsDatabase:
         """, (key, value))
         self.connection.commit()
 
+    def get_calculation_settings(self):
+        """
+        Возвращает настройки расчета времен намаза
+        
+        Returns:
+            dict: Координаты, смещение от UTC, метод и мазхаб
+        """
+        settings = {
+            key: self.get_setting(key) or default
+            for key, default in DEFAULT_CALCULATION_SETTINGS.items()
+        }
+        for key in ('latitude', 'longitude', 'elevation', 'utc_offset'):
+            settings[key] = float(settings[key])
+        settings['offsets'] = [int(value) for value in settings['offsets'].split(',')]
+        return settings
+
+    def get_cached_prayer_times(self, key):
+        """
+        Возвращает закэшированные времена намаза
+        
+        Args:
+            key (tuple): (date, location, method, madhab, offsets)
+        
+        Returns:
+            str или None: Минуты через запятую
+        """
+        self.cursor.execute('''
+            SELECT times FROM prayer_times 
+            WHERE date = ? AND location = ? AND method = ? AND madhab = ? AND offsets = ?
+        ''', key)
+        result = self.cursor.fetchone()
+        return result[0] if result else None
+
+    def save_cached_prayer_times(self, rows):
+        """
+        Сохраняет пачку времен намаза одной транзакцией
+        
+        Args:
+            rows (list): Кортежи (date, location, method, madhab, offsets, times)
+        """
+        self.cursor.executemany('''
+            INSERT OR REPLACE INTO prayer_times 
+            (date, location, method, madhab, offsets, times) 
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        self.connection.commit()
+
+    def delete_cached_prayer_times(self, components):
+        """
+        Удаляет записи кэша одного набора настроек (все даты)
+        
+        Args:
+            components (tuple): (location, method, madhab, offsets) устаревшего ключа
+        """
+        self.cursor.execute('''
+            DELETE FROM prayer_times 
+            WHERE location = ? AND method = ? AND madhab = ? AND offsets = ?
+        ''', components)
+        self.connection.commit()
+
     def save_window_settings(self, width, height, x, y):
         """
         Сохраняет настройки окна в БД
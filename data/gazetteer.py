@@ -0,0 +1,422 @@
+# data/gazetteer.py
+"""
+Офлайн-справочник городов: название, страна, координаты, высота и пояс.
+
+Города хранятся в одном бинарном файле столбцами (структура массивов).
+Порядок городов - неявное k-d дерево по единичным векторам (x, y, z):
+медиана каждого диапазона лежит в его середине, поэтому дерево не
+требует ни указателей, ни отдельного индекса. Поиск ближайшего города
+проходит около 2*log2(N) узлов, читая координаты прямо из mmap.
+
+Для поиска по началу названия в файле лежат нормализованные ключи
+названий в алфавитном порядке; начало диапазона находится бинарным
+поиском. Объекты Python создаются только для найденных городов.
+
+Структура файла (little-endian):
+    HEADER      сигнатура, версия, число поясов, число городов,
+                смещения разделов
+    xyz         float32[N][3]  единичные векторы городов (порядок дерева)
+    coords      int32[N][2]    широта и долгота в миллионных долях градуса
+    elevation   int16[N]       высота в метрах
+    zone        uint16[N]      номер пояса
+    country     2s[N]          код страны ISO 3166
+    name_offset uint32[N + 1]  границы названий в блоке names
+    key_offset  uint32[N + 1]  границы ключей в блоке keys
+    key_city    uint32[N]      город каждого ключа (ключи по алфавиту)
+    names, keys, zones         блоки UTF-8 (пояса разделены нулевым байтом)
+
+Сборка из CSV (name, country, latitude, longitude, elevation, timezone)
+или из выгрузки GeoNames (cities15000.txt):
+    python -m data.gazetteer build data/cities.csv
+    python -m data.gazetteer nearest 40.41 49.87
+    python -m data.gazetteer search bak
+
+Настройка места экрана (режим приложения, без окна):
+    python main.py location Şəki
+    python main.py location 40.41 49.87
+"""
+import csv
+import math
+import mmap
+import os
+import struct
+import unicodedata
+from collections import namedtuple
+from zoneinfo import ZoneInfoNotFoundError
+import numpy as np
+from logic.timezones import current_offset
+
+HEADER = struct.Struct('<4sHHI10I')
+MAGIC = b'AGAZ'
+VERSION = 1
+
+# Файл справочника рядом с базой настроек
+GAZETTEER_PATH = 'data/gazetteer.bin'
+
+# Средний радиус Земли, км
+EARTH_RADIUS_KM = 6371.0
+
+# Дальше этого расстояния высота ближайшего города к точке не относится, км
+ELEVATION_RADIUS_KM = 10.0
+
+# Найденный город
+City = namedtuple('City', 'name country latitude longitude elevation timezone')
+
+# Буквы, которые NFKD не раскладывает на латиницу
+_TRANSLITERATION = str.maketrans({'ı': 'i', 'ə': 'e', 'ß': 'ss', 'ø': 'o', 'đ': 'd', 'ł': 'l'})
+
+def normalize_name(name):
+    """Ключ поиска: нижний регистр без диакритики (Bakı, BAKI и baki совпадают)"""
+    decomposed = unicodedata.normalize('NFKD', name.casefold().translate(_TRANSLITERATION))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).translate(_TRANSLITERATION)
+
+def unit_vectors(latitudes, longitudes):
+    """Единичные векторы (N, 3) для широт и долгот в градусах"""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+def read_source(path):
+    """
+    Читает города из CSV справочника или из выгрузки GeoNames
+
+    Yields:
+        tuple: (название, страна, широта, долгота, высота, пояс)
+    """
+    with open(path, newline='', encoding='utf-8') as file:
+        if path.endswith('.csv'):
+            for row in csv.DictReader(file):
+                yield (
+                    row['name'], row['country'], float(row['latitude']), float(row['longitude']),
+                    int(float(row['elevation'] or 0)), row['timezone']
+                )
+            return
+        # GeoNames: name=1, latitude=4, longitude=5, country=8, elevation=15, dem=16, timezone=17
+        for line in file:
+            fields = line.rstrip('\n').split('\t')
+            elevation = fields[15] or fields[16] or '0'
+            yield fields[1], fields[8], float(fields[4]), float(fields[5]), int(elevation), fields[17]
+
+def _kd_order(xyz, index, depth, order):
+    """Раскладывает index в порядке неявного k-d дерева (медиана - в середине диапазона)"""
+    if len(index) == 0:
+        return
+    axis = depth % 3
+    index = index[np.argsort(xyz[index, axis], kind='stable')]
+    middle = len(index) // 2
+    _kd_order(xyz, index[:middle], depth + 1, order)
+    order.append(index[middle])
+    _kd_order(xyz, index[middle + 1:], depth + 1, order)
+
+def build_gazetteer(cities, path=GAZETTEER_PATH):
+    """
+    Записывает справочник
+
+    Args:
+        cities (iterable): Кортежи (название, страна, широта, долгота, высота, пояс)
+        path (str): Путь к файлу
+
+    Returns:
+        int: Число городов
+    """
+    rows = list(cities)
+    count = len(rows)
+    latitudes = np.array([row[2] for row in rows])
+    longitudes = np.array([row[3] for row in rows])
+    xyz = unit_vectors(latitudes, longitudes)
+
+    order = []
+    _kd_order(xyz, np.arange(count), 0, order)
+    order = np.array(order, dtype=np.int64)
+    rows = [rows[number] for number in order]
+    xyz = xyz[order]
+
+    zones = sorted({row[5] for row in rows})
+    zone_numbers = {zone: number for number, zone in enumerate(zones)}
+
+    names = [row[0].encode('utf-8') for row in rows]
+    keys = sorted((normalize_name(row[0]).encode('utf-8'), number) for number, row in enumerate(rows))
+
+    sections = [
+        xyz.astype('<f4').tobytes(),
+        np.round(np.stack([latitudes[order], longitudes[order]], axis=-1) * 1e6).astype('<i4').tobytes(),
+        np.array([row[4] for row in rows], dtype='<i2').tobytes(),
+        np.array([zone_numbers[row[5]] for row in rows], dtype='<u2').tobytes(),
+        b''.join(row[1].encode('ascii')[:2].ljust(2) for row in rows),
+        np.concatenate([[0], np.cumsum([len(name) for name in names])]).astype('<u4').tobytes(),
+        np.concatenate([[0], np.cumsum([len(key) for key, _ in keys])]).astype('<u4').tobytes(),
+        np.array([number for _, number in keys], dtype='<u4').tobytes(),
+        b''.join(names),
+        b''.join(key for key, _ in keys),
+        b'\0'.join(zone.encode('utf-8') for zone in zones),
+    ]
+
+    # Разделы выравниваются по 4 байта, чтобы memoryview.cast работал без копий
+    offsets = []
+    position = HEADER.size
+    for section in sections[:-1]:
+        offsets.append(position)
+        position += (len(section) + 3) & ~3
+    offsets.append(position)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(zones), count, *offsets[1:]))
+        for section in sections:
+            file.write(section)
+            file.write(b'\0' * (-len(section) % 4))
+    os.replace(temp_path, path)
+    return count
+
+class Gazetteer:
+    """Справочник городов, открытый только для чтения через mmap"""
+
+    def __init__(self, path=GAZETTEER_PATH):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        self._view = view
+
+        magic, version, zone_count, count, *offsets = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Неподдерживаемый формат справочника: {path}")
+        self.count = count
+
+        bounds = [HEADER.size] + offsets + [len(self._mmap)]
+        sizes = [count * 12, count * 8, count * 2, count * 2, count * 2,
+                 (count + 1) * 4, (count + 1) * 4, count * 4]
+        # Все представления разделов, чтобы close() мог их освободить
+        self._buffers = []
+
+        def section(number, fmt=None):
+            end = bounds[number] + sizes[number] if number < len(sizes) else bounds[number + 1]
+            buffer = view[bounds[number]:end]
+            if fmt is not None:
+                buffer = buffer.cast(fmt)
+            self._buffers.append(buffer)
+            return buffer
+
+        self._xyz = section(0, 'f')
+        self._coords = section(1, 'i')
+        self._elevation = section(2, 'h')
+        self._zone = section(3, 'H')
+        self._country = section(4)
+        self._name_offset = section(5, 'I')
+        self._key_offset = section(6, 'I')
+        self._key_city = section(7, 'I')
+        self._names = section(8)
+        self._keys = section(9)
+        zones = section(10)
+        # Поясов немного (сотни), их имена разбираются сразу
+        self.zones = bytes(zones).rstrip(b'\0').decode('utf-8').split('\0') if zone_count else []
+
+    def __len__(self):
+        return self.count
+
+    def city(self, number):
+        """Город по номеру в файле"""
+        name = bytes(self._names[self._name_offset[number]:self._name_offset[number + 1]])
+        return City(
+            name.decode('utf-8'),
+            bytes(self._country[number * 2:number * 2 + 2]).decode('ascii').strip(),
+            self._coords[number * 2] / 1e6,
+            self._coords[number * 2 + 1] / 1e6,
+            self._elevation[number],
+            self.zones[self._zone[number]]
+        )
+
+    def nearest(self, latitude, longitude):
+        """
+        Ближайший город
+
+        Returns:
+            tuple: (City, расстояние по дуге в км) или (None, None) для пустого справочника
+        """
+        if not self.count:
+            return None, None
+        lat, lon = math.radians(latitude), math.radians(longitude)
+        target = (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+        xyz = self._xyz
+
+        # Обход неявного дерева: узел - середина диапазона [low, high).
+        # Дальняя ветвь кладется в стек с квадратом расстояния до плоскости
+        # раздела и отбрасывается при извлечении, если лучший уже ближе
+        stack = [(0, self.count, 0, 0.0)]
+        best_number, best_distance = None, math.inf
+        while stack:
+            low, high, depth, bound = stack.pop()
+            while low < high and bound < best_distance:
+                middle = (low + high) // 2
+                base = middle * 3
+                dx = xyz[base] - target[0]
+                dy = xyz[base + 1] - target[1]
+                dz = xyz[base + 2] - target[2]
+                distance = dx * dx + dy * dy + dz * dz
+                if distance < best_distance:
+                    best_number, best_distance = middle, distance
+
+                axis = depth % 3
+                delta = target[axis] - xyz[base + axis]
+                depth += 1
+                if delta > 0:
+                    stack.append((low, middle, depth, delta * delta))
+                    low = middle + 1
+                else:
+                    stack.append((middle + 1, high, depth, delta * delta))
+                    high = middle
+
+        chord = math.sqrt(best_distance)
+        return self.city(best_number), 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+    def _key(self, position):
+        return bytes(self._keys[self._key_offset[position]:self._key_offset[position + 1]])
+
+    def search(self, prefix, limit=10):
+        """
+        Города, название которых начинается с prefix (без учета регистра и диакритики)
+
+        Returns:
+            list: До limit городов в алфавитном порядке
+        """
+        key = normalize_name(prefix).encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        found = []
+        while low < self.count and len(found) < limit and self._key(low).startswith(key):
+            found.append(self.city(self._key_city[low]))
+            low += 1
+        return found
+
+    def close(self):
+        """Освобождает представления разделов и mmap"""
+        for buffer in getattr(self, '_buffers', ()):
+            buffer.release()
+        self._view.release()
+        self._mmap.close()
+
+def city_settings(city):
+    """Настройки расчета для города (ключи SettingsDatabase.DEFAULT_CALCULATION_SETTINGS)"""
+    return location_settings(city.latitude, city.longitude, city.elevation, city.timezone)
+
+def location_settings(latitude, longitude, elevation, zone):
+    """
+    Настройки расчета для точки
+
+    utc_offset - текущее смещение пояса: по нему считается, если пояса
+    нет в базе zoneinfo устройства.
+    """
+    settings = {
+        'latitude': f"{latitude:.4f}",
+        'longitude': f"{longitude:.4f}",
+        # Поправка восхода по высоте не определена ниже уровня моря (Баку -28 м)
+        'elevation': str(max(elevation, 0)),
+        'timezone': zone
+    }
+    try:
+        settings['utc_offset'] = f"{current_offset(zone):g}"
+    except (ZoneInfoNotFoundError, ValueError):
+        # Без базы поясов остается прежнее смещение
+        pass
+    return settings
+
+def _coordinates(args):
+    """
+    Координаты из двух аргументов команды
+
+    Returns:
+        tuple: (широта, долгота) или None, если аргументы - название
+
+    Raises:
+        ValueError: Числом задан только один из двух аргументов
+    """
+    values = []
+    for arg in args:
+        try:
+            values.append(float(arg))
+        except ValueError:
+            values.append(None)
+    if len(values) != 2 or values == [None, None]:
+        return None
+    if None in values:
+        raise ValueError(f"Широта и долгота должны быть числами: {' '.join(args)}")
+    return tuple(values)
+
+def main(argv):
+    """
+    Команды справочника:
+        build [источник]         - собрать data/gazetteer.bin
+        nearest ШИРОТА ДОЛГОТА   - ближайший город
+        search НАЧАЛО            - города по началу названия
+        apply НАЗВАНИЕ | ШИРОТА ДОЛГОТА - записать город в настройки расчета
+    """
+    import time
+
+    command = argv[0] if argv else 'build'
+    if command == 'build':
+        source = argv[1] if len(argv) > 1 else 'data/cities.csv'
+        print(f"{build_gazetteer(read_source(source))} городов -> {GAZETTEER_PATH}")
+        return 0
+
+    coordinates = None
+    if command in ('nearest', 'apply'):
+        usage = ("Использование: apply НАЗВАНИЕ | ШИРОТА ДОЛГОТА" if command == 'apply'
+                 else "Использование: nearest ШИРОТА ДОЛГОТА")
+        try:
+            coordinates = _coordinates(argv[1:])
+        except ValueError as error:
+            print(error)
+            print(usage)
+            return 2
+        # Без названия поиск вернул бы первый город справочника
+        if coordinates is None and (command == 'nearest' or not ' '.join(argv[1:]).strip()):
+            print(usage)
+            return 2
+
+    gazetteer = Gazetteer()
+    try:
+        started = time.perf_counter()
+        if command == 'search':
+            cities = gazetteer.search(' '.join(argv[1:]))
+        elif command in ('nearest', 'apply') and coordinates is not None:
+            city, distance = gazetteer.nearest(*coordinates)
+            cities = [city] if city is not None else []
+        else:
+            cities = gazetteer.search(' '.join(argv[1:]), limit=1)
+        elapsed = time.perf_counter() - started
+        for city in cities:
+            print(city)
+        print(f"{elapsed * 1e6:.0f} мкс")
+
+        if command == 'apply':
+            if not cities:
+                print("Город не найден")
+                return 1
+            from data.database import SettingsDatabase
+            db = SettingsDatabase()
+            if coordinates is None:
+                settings = city_settings(cities[0])
+            else:
+                # Место - сама точка: у границы пояса ближайший город может
+                # оказаться по другую сторону, а его высота - не высотой точки
+                from data.timezone_index import timezone_at
+                elevation = cities[0].elevation if distance <= ELEVATION_RADIUS_KM else 0
+                settings = location_settings(*coordinates, elevation, timezone_at(*coordinates, gazetteer))
+            print(', '.join(f"{key}={value}" for key, value in settings.items()))
+            db.save_setting('city', cities[0].name)
+            # Записи кэша времен прежнего места удаляются вместе со сменой настроек
+            from logic.prayer_cache import PrayerTimesCache
+            PrayerTimesCache(db, compute_year=None).apply_settings(settings)
+    finally:
+        gazetteer.close()
+    return 0
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,168 @@
+# data/timetable.py
+"""
+Бинарный формат заранее рассчитанных расписаний.
+
+Файл содержит несколько таблиц (по одной на город и год) и индекс
+смещений. Каждая таблица - 366 дней x 7 времен в uint16 (минуты от
+полуночи). Файл читается через mmap; строка дня и таблица года -
+массивы NumPy поверх участка файла, без разбора и без копирования.
+Строка дня - первый уровень кэша времен намаза после памяти
+(см. logic.prayer_cache), поэтому запуск не обращается к SQLite.
+
+Структура файла (little-endian):
+    HEADER        сигнатура, версия, число времен, число дней, число таблиц
+    INDEX_ENTRY   ключ (до 32 байт UTF-8), год, смещение таблицы - на каждую таблицу
+    таблицы       uint16[366][7]
+"""
+import math
+import mmap
+import os
+import struct
+import numpy as np
+
+HEADER = struct.Struct('<4sHHHH')
+INDEX_ENTRY = struct.Struct('<32sHxxI')
+MAGIC = b'ADTT'
+VERSION = 1
+
+PRAYERS_PER_DAY = 7
+DAYS_PER_TABLE = 366
+TABLE_BYTES = PRAYERS_PER_DAY * DAYS_PER_TABLE * 2
+
+# Значение для отсутствующего времени (полярный день/ночь)
+MISSING = 0xFFFF
+
+def day_index(day):
+    """Номер строки таблицы для даты (0 - первое января)"""
+    return day.timetuple().tm_yday - 1
+
+def write_timetable_bundle(path, tables):
+    """
+    Записывает таблицы в один файл
+
+    Args:
+        path (str): Путь к файлу
+        tables (dict): {(ключ, год): матрица (дни, 7) в минутах от полуночи}
+    """
+    entries = sorted(tables.items())
+    for key, _ in tables:
+        if len(key.encode('utf-8')) > 32:
+            raise ValueError(f"Ключ расписания длиннее 32 байт: {key}")
+    data_offset = HEADER.size + INDEX_ENTRY.size * len(entries)
+
+    # Пишем во временный файл и подменяем, чтобы не испортить открытый через mmap файл
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, PRAYERS_PER_DAY, DAYS_PER_TABLE, len(entries)))
+        for number, ((key, year), _) in enumerate(entries):
+            file.write(INDEX_ENTRY.pack(key.encode('utf-8'), year, data_offset + number * TABLE_BYTES))
+        for _, minutes in entries:
+            table = np.full((DAYS_PER_TABLE, PRAYERS_PER_DAY), MISSING, dtype='<u2')
+            minutes = np.asarray(minutes, dtype=np.float64)
+            rounded = np.round(np.nan_to_num(minutes)) % 1440
+            table[:len(minutes)] = np.where(np.isnan(minutes), MISSING, rounded)
+            file.write(table.tobytes())
+    os.replace(temp_path, path)
+
+class TimetableBundle:
+    """Набор расписаний, открытый только для чтения через mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, prayers, days, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or prayers != PRAYERS_PER_DAY or days != DAYS_PER_TABLE:
+            self.close()
+            raise ValueError(f"Неподдерживаемый формат расписания: {path}")
+
+        # Индекс маленький, поэтому разбираем его сразу в словарь
+        self.offsets = {}
+        for number in range(count):
+            key, year, offset = INDEX_ENTRY.unpack_from(self._mmap, HEADER.size + number * INDEX_ENTRY.size)
+            self.offsets[(key.rstrip(b'\0').decode('utf-8'), year)] = offset
+
+    def __contains__(self, key_year):
+        return key_year in self.offsets
+
+    def table(self, key, year):
+        """Возвращает таблицу года как массив NumPy поверх mmap (без копирования)"""
+        return np.frombuffer(
+            self._mmap, dtype='<u2',
+            count=DAYS_PER_TABLE * PRAYERS_PER_DAY,
+            offset=self.offsets[(key, year)]
+        ).reshape(DAYS_PER_TABLE, PRAYERS_PER_DAY)
+
+    def row(self, key, day):
+        """
+        Строка дня как массив NumPy поверх memoryview файла (без копирования)
+
+        Args:
+            key (str): Ключ города
+            day (date): Дата
+
+        Returns:
+            np.ndarray: 7 значений uint16 (MISSING - время отсутствует)
+        """
+        offset = self.offsets[(key, day.year)] + day_index(day) * PRAYERS_PER_DAY * 2
+        return np.frombuffer(self._view, dtype='<u2', count=PRAYERS_PER_DAY, offset=offset)
+
+    def day_minutes(self, key, day):
+        """
+        Времена дня в минутах
+
+        Returns:
+            tuple: 7 значений (NaN - время отсутствует) или None, если года нет в файле
+        """
+        if (key, day.year) not in self.offsets:
+            return None
+        return tuple(math.nan if value == MISSING else float(value) for value in self.row(key, day).tolist())
+
+    def minutes(self, key, year):
+        """Возвращает копию таблицы года в минутах (float, NaN вместо MISSING)"""
+        values = self.table(key, year).astype(np.float64)
+        values[values == MISSING] = np.nan
+        return values
+
+    def close(self):
+        """Освобождает memoryview и mmap"""
+        self._view.release()
+        self._mmap.close()
+
+def open_timetable(path, key, year, compute_year):
+    """
+    Открывает файл расписаний и при необходимости дописывает в него год
+
+    При перезаписи остаются только таблицы того же ключа начиная с
+    прошлого года: таблицы прежних настроек и прошедших лет больше не
+    нужны, поэтому файл не растет от смены настроек.
+
+    Args:
+        path (str): Путь к файлу
+        key (str): Ключ города
+        year (int): Год
+        compute_year (callable): Функция year -> матрица (дни, 7) в минутах
+
+    Returns:
+        TimetableBundle: Открытый файл, в котором есть (key, year)
+    """
+    tables = {}
+    if os.path.exists(path):
+        try:
+            bundle = TimetableBundle(path)
+        except ValueError:
+            bundle = None
+        if bundle is not None:
+            if (key, year) in bundle:
+                return bundle
+            # Сохраняем актуальные таблицы текущих настроек
+            for table_key, table_year in bundle.offsets:
+                if table_key == key and table_year >= year - 1:
+                    tables[(table_key, table_year)] = bundle.minutes(table_key, table_year)
+            bundle.close()
+
+    tables[(key, year)] = compute_year(year)
+    write_timetable_bundle(path, tables)
+    return TimetableBundle(path)
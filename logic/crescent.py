@@ -0,0 +1,307 @@
+"""
+Видимость молодой луны (хиляля) сразу для многих вечеров и мест.
+
+Для каждой пары (вечер, место) одной векторной операцией NumPy
+считаются закат солнца, заход луны, положение обоих светил в лучшее
+время наблюдения (закат + 4/9 запаздывания луны) и по ним - критерии
+Яллопа (q) и Одеха (V). Год для ста городов считается за доли секунды.
+
+По видимости в одном месте строится таблица начал месяцев хиджры:
+месяц начинается на следующий день после вечера 29-го числа, если
+серп виден, иначе после 30-го. Таблица подставляется в HijriCalendar
+вместо табличного календаря.
+
+Положение луны - сокращенный ряд Meeus (гл. 47, главные члены). На
+примере 47.a расхождение 0.005° по долготе, 0.006° по широте и 29 км
+по расстоянию; этого достаточно для критериев видимости, граница
+которых размыта сильнее.
+"""
+from datetime import date
+import numpy as np
+from logic.solar_ephemeris import sun_ecliptic, sun_position
+from logic.prayer_times import UNIX_EPOCH_JD, to_days
+from logic.hijri import HijriCalendar, hijri_calendar, tabular_month_starts, UNIX_EPOCH_JDN
+
+# Члены рядов долготы и расстояния луны: (D, M, M', F, sin l, cos r)
+# (коэффициенты долготы в 1e-6 градуса, расстояния - в метрах)
+_LONGITUDE_TERMS = np.array([
+    (0, 0, 1, 0, 6288774, -20905355),
+    (2, 0, -1, 0, 1274027, -3699111),
+    (2, 0, 0, 0, 658314, -2955968),
+    (0, 0, 2, 0, 213618, -569925),
+    (0, 1, 0, 0, -185116, 48888),
+    (0, 0, 0, 2, -114332, -3149),
+    (2, 0, -2, 0, 58793, 246158),
+    (2, -1, -1, 0, 57066, -152138),
+    (2, 0, 1, 0, 53322, -170733),
+    (2, -1, 0, 0, 45758, -204586),
+    (0, 1, -1, 0, -40923, -129620),
+    (1, 0, 0, 0, -34720, 108743),
+    (0, 1, 1, 0, -30383, 104755),
+    (2, 0, 0, -2, 15327, 10321),
+    (0, 0, 1, 2, -12528, 0),
+    (0, 0, 1, -2, 10980, 79661),
+    (4, 0, -1, 0, 10675, -34782),
+    (0, 0, 3, 0, 10034, -23210),
+    (4, 0, -2, 0, 8548, -21636),
+], dtype=np.float64)
+
+# Члены ряда широты луны: (D, M, M', F, sin b) в 1e-6 градуса
+_LATITUDE_TERMS = np.array([
+    (0, 0, 0, 1, 5128122),
+    (0, 0, 1, 1, 280602),
+    (0, 0, 1, -1, 277693),
+    (2, 0, 0, -1, 173237),
+    (2, 0, -1, 1, 55413),
+    (2, 0, -1, -1, 46271),
+    (2, 0, 0, 1, 32573),
+    (0, 0, 2, 1, 17198),
+    (2, 0, 1, -1, 9266),
+    (0, 0, 2, -1, 8822),
+], dtype=np.float64)
+
+# Экваториальный радиус Земли, км
+EARTH_RADIUS = 6378.14
+
+# Высота верхнего края солнца на закате с рефракцией, градусы
+SUNSET_ALTITUDE = -0.8333
+
+# Скорость суточного движения луны относительно горизонта, градусов в час
+MOON_HOUR_RATE = 14.49
+
+# Пороги категорий Яллопа (A - видна легко ... F - не видна)
+YALLOP_THRESHOLDS = (0.216, -0.014, -0.160, -0.232, -0.293)
+YALLOP_CATEGORIES = 'ABCDEF'
+
+# Пороги Одеха: глазом, в оптику, только в телескоп
+ODEH_THRESHOLDS = (5.65, 2.0, -0.96)
+
+# Порог, с которого серп считается увиденным, для каждого критерия
+VISIBILITY_CRITERIA = {
+    'yallop': ('q', YALLOP_THRESHOLDS[1]),
+    'odeh': ('v', ODEH_THRESHOLDS[0]),
+}
+
+def moon_position(jd):
+    """
+    Геоцентрическое положение луны (Meeus, гл. 47, главные члены)
+
+    Returns:
+        tuple: (долгота, широта в радианах, расстояние в км)
+    """
+    t = (np.asarray(jd, dtype=np.float64) - 2451545.0) / 36525.0
+
+    mean_longitude = 218.3164477 + 481267.88123421 * t
+    arguments = np.radians(np.stack([
+        297.8501921 + 445267.1114034 * t,   # D - элонгация
+        357.5291092 + 35999.0502909 * t,    # M - аномалия солнца
+        134.9633964 + 477198.8675055 * t,   # M' - аномалия луны
+        93.2720950 + 483202.0175233 * t,    # F - аргумент широты
+    ], axis=-1))
+    e = 1.0 - t * (0.002516 + t * 0.0000074)
+
+    def series(terms):
+        angles = arguments @ terms[:, :4].T
+        # Члены с аномалией солнца умножаются на E^|M|
+        factor = e[..., None] ** np.abs(terms[:, 1])
+        return angles, factor
+
+    angles, factor = series(_LONGITUDE_TERMS)
+    longitude = mean_longitude + (factor * np.sin(angles)) @ _LONGITUDE_TERMS[:, 4] * 1e-6
+    distance = 385000.56 + (factor * np.cos(angles)) @ _LONGITUDE_TERMS[:, 5] * 1e-3
+
+    angles, factor = series(_LATITUDE_TERMS)
+    latitude = (factor * np.sin(angles)) @ _LATITUDE_TERMS[:, 4] * 1e-6
+
+    return np.radians(longitude % 360.0), np.radians(latitude), distance
+
+def _equatorial(longitude, latitude, epsilon):
+    """Эклиптические координаты в прямое восхождение и склонение (радианы)"""
+    right_ascension = np.arctan2(
+        np.sin(longitude) * np.cos(epsilon) - np.tan(latitude) * np.sin(epsilon),
+        np.cos(longitude)
+    )
+    declination = np.arcsin(
+        np.sin(latitude) * np.cos(epsilon)
+        + np.cos(latitude) * np.sin(epsilon) * np.sin(longitude)
+    )
+    return right_ascension, declination
+
+def _sidereal_time(jd):
+    """Среднее звездное время Гринвича в радианах"""
+    d = jd - 2451545.0
+    return np.radians((280.46061837 + 360.98564736629 * d) % 360.0)
+
+def _altitude(latitude, declination, hour_angle):
+    return np.arcsin(
+        np.sin(latitude) * np.sin(declination)
+        + np.cos(latitude) * np.cos(declination) * np.cos(hour_angle)
+    )
+
+def _set_hour_angle(latitude, declination, altitude):
+    """Часовой угол захода на высоте altitude (NaN, если светило не заходит)"""
+    cos_h = (np.sin(altitude) - np.sin(latitude) * np.sin(declination)) / (
+        np.cos(latitude) * np.cos(declination))
+    with np.errstate(invalid='ignore'):
+        return np.arccos(np.where(np.abs(cos_h) <= 1.0, cos_h, np.nan))
+
+def _wrap(angle):
+    """Угол в диапазон [-pi, pi)"""
+    return (angle + np.pi) % (2 * np.pi) - np.pi
+
+def _bodies(jd, latitude, longitude):
+    """
+    Солнце и луна в момент jd для места (все массивы одной формы)
+
+    Returns:
+        dict: Высоты, часовые углы, склонения, элонгация, параллакс и
+              полудиаметр луны, разность эклиптических долгот
+    """
+    sun_longitude, epsilon = sun_ecliptic(jd)
+    sun_ra, sun_dec = _equatorial(sun_longitude, 0.0, epsilon)
+    moon_longitude, moon_latitude, distance = moon_position(jd)
+    moon_ra, moon_dec = _equatorial(moon_longitude, moon_latitude, epsilon)
+
+    local_sidereal = _sidereal_time(jd) + longitude
+    moon_hour_angle = _wrap(local_sidereal - moon_ra)
+    parallax = np.arcsin(EARTH_RADIUS / distance)
+    moon_altitude = _altitude(latitude, moon_dec, moon_hour_angle)
+
+    return {
+        'sun_altitude': _altitude(latitude, sun_dec, local_sidereal - sun_ra),
+        'moon_altitude': moon_altitude,
+        # Топоцентрическая высота луны без рефракции
+        'moon_topocentric': moon_altitude - parallax * np.cos(moon_altitude),
+        'moon_hour_angle': moon_hour_angle,
+        'moon_declination': moon_dec,
+        'parallax': parallax,
+        # Геоцентрическая элонгация луны от солнца
+        'elongation': np.arccos(np.clip(
+            np.sin(sun_dec) * np.sin(moon_dec)
+            + np.cos(sun_dec) * np.cos(moon_dec) * np.cos(sun_ra - moon_ra),
+            -1.0, 1.0
+        )),
+        'phase_angle': _wrap(moon_longitude - sun_longitude),
+    }
+
+def crescent_visibility(days, latitudes, longitudes):
+    """
+    Видимость серпа вечером каждого дня в каждом месте
+
+    Args:
+        days: Даты (date, datetime64 или дни от 1970-01-01), форма (N,)
+        latitudes: Широты мест в градусах, форма (L,)
+        longitudes: Долготы мест в градусах (восток положительный), форма (L,)
+
+    Returns:
+        dict: Массивы формы (N, L):
+              sunset - закат, часы UTC;
+              lag - запаздывание захода луны, минуты;
+              arcl, arcv, width - элонгация и дуга видимости (градусы),
+              ширина серпа (угловые минуты) в лучшее время;
+              q, v - критерии Яллопа и Одеха (NaN, если луна заходит
+              до солнца или еще не прошло новолуние)
+    """
+    days = to_days(days)[:, None]
+    latitude = np.radians(np.asarray(latitudes, dtype=np.float64))[None, :]
+    longitude_deg = np.asarray(longitudes, dtype=np.float64)[None, :]
+    longitude = np.radians(longitude_deg)
+    midnight = days + UNIX_EPOCH_JD
+
+    # Закат солнца по эфемериде в приближенный момент заката
+    declination, eqt = sun_position(midnight + (18.0 - longitude_deg / 15.0) / 24.0)
+    sun_set_angle = _set_hour_angle(latitude, np.radians(declination), np.radians(SUNSET_ALTITUDE))
+    sunset = 12.0 - longitude_deg / 15.0 - eqt + np.degrees(sun_set_angle) / 15.0
+    sunset_jd = midnight + sunset / 24.0
+
+    # Запаздывание захода луны по ее положению на закате
+    at_sunset = _bodies(sunset_jd, latitude, longitude)
+    moon_set_altitude = 0.7275 * at_sunset['parallax'] - np.radians(0.5667)
+    moon_set_angle = _set_hour_angle(latitude, at_sunset['moon_declination'], moon_set_altitude)
+    lag = np.degrees(moon_set_angle - at_sunset['moon_hour_angle']) / MOON_HOUR_RATE
+
+    # Лучшее время наблюдения по Яллопу
+    best = _bodies(sunset_jd + 4.0 / 9.0 * lag / 24.0, latitude, longitude)
+    arcl = best['elongation']
+    arcv = np.degrees(best['moon_topocentric'] - best['sun_altitude'])
+    semidiameter = 0.27245 * best['parallax'] * (1.0 + np.sin(best['moon_altitude']) * np.sin(best['parallax']))
+    width = np.degrees(semidiameter) * 60.0 * (1.0 - np.cos(arcl))
+
+    polynomial = -0.1018 * width ** 3 + 0.7319 * width ** 2 - 6.3226 * width
+    # Серп возможен, только если новолуние уже было и луна заходит после солнца
+    waxing = (lag > 0) & (at_sunset['phase_angle'] > 0)
+
+    return {
+        'sunset': sunset,
+        'lag': lag * 60.0,
+        'arcl': np.degrees(arcl),
+        'arcv': arcv,
+        'width': width,
+        'q': np.where(waxing, (arcv - (11.8371 + polynomial)) / 10.0, np.nan),
+        'v': np.where(waxing, arcv - (7.1651 + polynomial), np.nan),
+    }
+
+def yallop_category(q):
+    """Категория Яллопа A-F для массива q (NaN - F)"""
+    q = np.nan_to_num(np.asarray(q, dtype=np.float64), nan=-np.inf)
+    index = np.sum(q[..., None] <= np.array(YALLOP_THRESHOLDS), axis=-1)
+    return np.array(list(YALLOP_CATEGORIES))[index]
+
+def sighting_month_starts(first_year, last_year, latitude, longitude, criterion='odeh'):
+    """
+    Начала месяцев хиджры по видимости серпа в одном месте
+
+    Видимость считается одним вызовом для всех вечеров диапазона,
+    затем месяцы проходятся по порядку (длина месяца зависит от
+    начала предыдущего). Первый месяц привязан к табличному календарю,
+    его возможная ошибка в день исправляется уже на следующем месяце.
+
+    Returns:
+        np.ndarray: JDN начал месяцев в формате tabular_month_starts
+    """
+    key, threshold = VISIBILITY_CRITERIA[criterion]
+    tabular = tabular_month_starts(first_year, last_year)
+
+    # Все вечера от 29-го числа первого месяца до 30-го числа последнего
+    first_evening = int(tabular[0]) + 28
+    evenings = np.arange(first_evening, int(tabular[-1]) + 31)
+    visibility = crescent_visibility(evenings - UNIX_EPOCH_JDN, [latitude], [longitude])[key][:, 0]
+    visible = (np.nan_to_num(visibility, nan=-np.inf) >= threshold).tolist()
+
+    starts = [int(tabular[0])]
+    for _ in range(len(tabular) - 1):
+        # Вечер 29-го числа: серп виден - месяц из 29 дней, иначе из 30
+        evening = starts[-1] + 28
+        starts.append(evening + 1 if visible[evening - first_evening] else evening + 2)
+    return np.array(starts, dtype=np.int64)
+
+def sighting_calendar(latitude, longitude, criterion='odeh', around=None, years=1):
+    """
+    Календарь хиджры по видимости серпа на years лет вокруг даты around
+
+    Returns:
+        HijriCalendar: Календарь для DateService
+    """
+    year = hijri_calendar.to_hijri(around or date.today())[0]
+    first_year, last_year = year - years, year + years
+    return HijriCalendar(
+        sighting_month_starts(first_year, last_year, latitude, longitude, criterion),
+        first_year
+    )
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    # Замер: год вечеров для ста мест
+    cities = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rng = np.random.default_rng(0)
+    latitudes = rng.uniform(-55.0, 55.0, cities)
+    longitudes = rng.uniform(-180.0, 180.0, cities)
+    days = np.arange(np.datetime64('2025-01-01'), np.datetime64('2026-01-01'))
+
+    started = time.perf_counter()
+    result = crescent_visibility(days, latitudes, longitudes)
+    elapsed = time.perf_counter() - started
+    print(f"{len(days)} вечеров x {cities} мест: {elapsed * 1e3:.1f} мс")
+    print(f"вечеров с видимым серпом (Одех): {int(np.sum(result['v'] >= ODEH_THRESHOLDS[0]))}")
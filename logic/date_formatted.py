@@ -1,7 +1,5 @@
-from datetime import datetime
-from kivy.uix.label import Label
-from kivy.uix.gridlayout import GridLayout
-from kivy.core.window import Window
+from datetime import date
+from logic.hijri import hijri_calendar
 
 # Словари для конвертации в римские цифры
 WEEKDAY_TO_ROMAN = {
@@ -44,18 +42,25 @@ HIJRI_MONTH_TO_ROMAN = {
     12: 'XII'   # Зу-ль-хиджа
 }
 
-def get_formatted_dates():
+def format_dates(current_date, calendar=hijri_calendar):
     """
-    Возвращает отформатированные даты
+    Возвращает отформатированные даты для дня
+    
+    Args:
+        current_date (date): Дата
+        calendar (HijriCalendar): Таблица начал месяцев хиджры
+    
     Returns:
         dict: Словарь с частями даты и их шрифтами
     """
-    current_date = datetime.now()
     
     # Григорианская дата в формате IV - 05.XII.2024
     weekday = current_date.weekday()
     month = current_date.month
     
+    # Дата хиджры: бинарный поиск месяца в таблице начал месяцев
+    hijri_year, hijri_month, hijri_day = calendar.to_hijri(current_date)
+    
     # Части даты с указанием шрифтов и размеров
     date_parts = {
         'weekday': {
@@ -82,17 +87,17 @@ def get_formatted_dates():
         
         # Части для даты хиджры с размерами
         'hijri_day': {
-            'text': '15',
+            'text': f"{hijri_day:02d}",
             'font': 'FontDSEG7-Light',
             'font_size': 40
         },
         'hijri_month': {
-            'text': f"/{HIJRI_MONTH_TO_ROMAN[12]}/",
+            'text': f"/{HIJRI_MONTH_TO_ROMAN[hijri_month]}/",
             'font': 'GothicRegular',
             'font_size': 40
         },
         'hijri_year': {
-            'text': '1445',
+            'text': str(hijri_year),
             'font': 'FontDSEG7-Light',
             'font_size': 40
         }
@@ -100,18 +105,10 @@ def get_formatted_dates():
     
     return date_parts
 
-def create_gregorian_date_label(base_font_size):
+def build_gregorian_markup(formatted_dates, base_font_size):
     """
-    Создает Label для григорианской даты с разными шрифтами и размерами в одной строке
-    
-    Args:
-        base_font_size (float): Базовый размер шрифта
-    
-    Returns:
-        Label: Label с датой в одной строке
+    Строит разметку григорианской даты с разными шрифтами и размерами
     """
-    formatted_dates = get_formatted_dates()
-    
     # Получаем размеры для каждой части из словаря или используем значения по умолчанию
     weekday_size = formatted_dates["weekday"].get('font_size', base_font_size * 0.24)
     day_size = formatted_dates["day"].get('font_size', base_font_size * 0.19)
@@ -119,117 +116,138 @@ def create_gregorian_date_label(base_font_size):
     year_size = formatted_dates["year"].get('font_size', base_font_size * 0.19)
     
     # Формируем текст с разметкой для разных шрифтов и размеров
-    marked_text = (
+    return (
         f'[size={int(weekday_size)}][font=DalekBold]{formatted_dates["weekday"]["text"]}[/font][/size]'
         f'[size={int(day_size)}][font=FontDSEG7-Light]{formatted_dates["day"]["text"]}[/font][/size]'
         f'[size={int(month_size)}][font=GothicRegular]{formatted_dates["month"]["text"]}[/font][/size]'
         f'[size={int(year_size)}][font=FontDSEG7-Light]{formatted_dates["year"]["text"]}[/font][/size]'
     )
-    
-    # Создаем Label с поддержкой разметки
-    date_label = Label(
-        text=marked_text,
-        markup=True,  # Включаем поддержку разметки
-        color=(1, 1, 1, 1),
-        size_hint_x=1,
-        size_hint_y=None,
-        height=base_font_size * 0.3,  # Увеличиваем высоту для разных размеров
-        halign='center',
-        valign='middle'
-    )
-    
-    return date_label
 
-def create_hijri_date_label(base_font_size):
+def build_hijri_markup(formatted_dates, size):
     """
-    Создает Label с датами хиджры и григорианской в одной строке
+    Строит разметку дат хиджры и григорианской в одной строке
     
     Args:
-        base_font_size (float): Базовый размер шрифта
-    
-    Returns:
-        Label: Label с обеими датами в одной строке
+        formatted_dates (dict): Результат format_dates
+        size (int): Размер шрифта всех частей
     """
-    formatted_dates = get_formatted_dates()
-    
-    # Рассчитываем базовый размер на основе ширины окна
-    window_width = Window.width
-    adaptive_base_size = window_width * 0.04  # 4% от ширины окна
-    
-    # Получаем размеры для каждой части из словаря или используем адаптивные значения
-    hijri_day_size = int(adaptive_base_size * 1)    # чуть меньше базового
-    hijri_month_size = int(adaptive_base_size * 1.0)
-    hijri_year_size = int(adaptive_base_size * 1)   # чуть меньше базового
-    greg_weekday_size = int(adaptive_base_size * 1.0)
-    greg_day_size = int(adaptive_base_size * 1)      # для дня
-    greg_month_size = int(adaptive_base_size * 1.0)
-    greg_year_size = int(adaptive_base_size * 1)     # для года
-    
-    # Формируем текст с разметкой для обеих дат
-    marked_text = (
+    return (
         # Дата хиджры
-        f'[size={hijri_year_size}][font=FontDSEG7-Light]{formatted_dates["hijri_year"]["text"]}[/font][/size]'
-        f'[size={hijri_month_size}][font=GothicRegular]{formatted_dates["hijri_month"]["text"]}[/font][/size]'
-        f'[size={hijri_day_size}][font=FontDSEG7-Light]{formatted_dates["hijri_day"]["text"]}[/font][/size]'
+        f'[size={size}][font=FontDSEG7-Light]{formatted_dates["hijri_year"]["text"]}[/font][/size]'
+        f'[size={size}][font=GothicRegular]{formatted_dates["hijri_month"]["text"]}[/font][/size]'
+        f'[size={size}][font=FontDSEG7-Light]{formatted_dates["hijri_day"]["text"]}[/font][/size]'
         # Григорианская дата
-        f'[size={greg_weekday_size}][font=DalekBold]{formatted_dates["weekday"]["text"]}[/font][/size]'
-        f'[size={greg_day_size}][font=FontDSEG7-Light]{formatted_dates["day"]["text"]}[/font][/size]'
-        f'[size={greg_month_size}][font=GothicRegular]{formatted_dates["month"]["text"]}[/font][/size]'
-        f'[size={greg_year_size}][font=FontDSEG7-Light]{formatted_dates["year"]["text"]}[/font][/size]'
+        f'[size={size}][font=DalekBold]{formatted_dates["weekday"]["text"]}[/font][/size]'
+        f'[size={size}][font=FontDSEG7-Light]{formatted_dates["day"]["text"]}[/font][/size]'
+        f'[size={size}][font=GothicRegular]{formatted_dates["month"]["text"]}[/font][/size]'
+        f'[size={size}][font=FontDSEG7-Light]{formatted_dates["year"]["text"]}[/font][/size]'
     )
+
+class DateService:
+    """
+    Части дат и готовая разметка, рассчитанные один раз за местный день
     
-    # Создаем Label с поддержкой разметки
-    date_label = Label(
-        text=marked_text,
-        markup=True,
-        color=(1, 1, 1, 1),
-        size_hint_x=1,
-        size_hint_y=None,
-        height=window_width * 0.06,  # Высота тоже адаптивная
-        halign='center',
-        valign='middle',
-        text_size=(Window.width, window_width * 0.06)  # Задаем полный размер текста
-    )
-    
-    # Привязываем обновление размеров к изменению размера окна
-    Window.bind(width=lambda *args: update_label_size(date_label))
-    
-    return date_label
+    Разметка кэшируется для каждого размера шрифта. Подписчики
+    (тот же интерфейс subscribe/unsubscribe, что у TickService)
+    получают обновление только при смене даты - в полночь.
+    """
+    def __init__(self, today=date.today, calendar=hijri_calendar):
+        self._today = today
+        self.calendar = calendar
+        self.day = None
+        self._dates = None
+        self._markup = {}
+        self._subscribers = []
+        # Дата, о которой подписчики оповещены последней (кэш разметки
+        # может обновиться раньше, если метку перерисуют после полуночи)
+        self._notified_day = None
+        # Источник таблицы месяцев на новый день (см. set_calendar)
+        self._calendar_source = None
+
+    def set_today(self, today):
+        """Заменяет источник сегодняшней даты (например, на дату по поясу расчета)"""
+        self._today = today
+        self.day = None
+
+    def get_formatted_dates(self, day=None):
+        """Части дат на день (по умолчанию на сегодня)"""
+        day = day or self._today()
+        if day != self.day:
+            self.day = day
+            self._dates = format_dates(day, self.calendar)
+            self._markup = {}
+        return self._dates
+
+    def markup(self, builder, size):
+        """
+        Готовая разметка на сегодня для размера size
+        
+        Args:
+            builder (callable): build_hijri_markup или build_gregorian_markup
+            size: Размер шрифта (ключ кэша)
+        """
+        formatted_dates = self.get_formatted_dates()
+        key = (builder, size)
+        text = self._markup.get(key)
+        if text is None:
+            text = builder(formatted_dates, size)
+            self._markup[key] = text
+        return text
+
+    def set_calendar(self, calendar, source=None):
+        """
+        Заменяет таблицу месяцев хиджры (например, на таблицу по
+        видимости серпа) и сразу обновляет подписанные метки
+
+        Args:
+            calendar (HijriCalendar): Таблица месяцев
+            source (callable): source(day) - таблица на новую дату; вызывается
+                               в полночь перед единственным обновлением меток
+        """
+        self.calendar = calendar
+        self._calendar_source = source
+        self.day = None
+        self._notify(self.get_formatted_dates())
+
+    def subscribe(self, callback, granularity='day'):
+        """Подписывает callback(formatted_dates) на смену даты"""
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback, granularity='day'):
+        """Отписывает callback"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def on_day(self, moment):
+        """Дневной тик TickService: оповещает подписчиков, только если дата сменилась"""
+        day = moment.date()
+        if day == self._notified_day:
+            return
+        if self._calendar_source is not None:
+            calendar = self._calendar_source(day)
+            if calendar is not self.calendar:
+                self.calendar = calendar
+                self.day = None
+        self._notify(self.get_formatted_dates(day))
+
+    def _notify(self, formatted_dates):
+        """Оповещает подписчиков и запоминает дату оповещения"""
+        self._notified_day = self.day
+        for callback in list(self._subscribers):
+            callback(formatted_dates)
 
-def update_label_size(label, *args):
+# Общий сервис дат приложения
+date_service = DateService()
+
+def get_formatted_dates():
     """
-    Обновляет размеры метки при изменении размера окна
+    Возвращает отформатированные даты на сегодня (рассчитываются раз в день)
+    Returns:
+        dict: Словарь с частями даты и их шрифтами
     """
-    window_width = Window.width
-    adaptive_base_size = window_width * 0.04
-    
-    # Обновляем высоту метки
-    label.height = window_width * 0.06
-    label.text_size = (window_width, window_width * 0.06)
-    
-    # Рассчитываем новые размеры
-    hijri_day_size = int(adaptive_base_size * 1)
-    hijri_month_size = int(adaptive_base_size * 1)
-    hijri_year_size = int(adaptive_base_size * 1)
-    greg_weekday_size = int(adaptive_base_size * 1)
-    greg_day_size = int(adaptive_base_size * 1)
-    greg_month_size = int(adaptive_base_size * 1)
-    greg_year_size = int(adaptive_base_size * 1)
-    
-    # Получаем форматированные даты заново
-    formatted_dates = get_formatted_dates()
-    
-    # Обновляем текст с новыми размерами
-    marked_text = (
-        f'[size={hijri_year_size}][font=FontDSEG7-Light]{formatted_dates["hijri_year"]["text"]}[/font][/size]'
-        f'[size={hijri_month_size}][font=GothicRegular]{formatted_dates["hijri_month"]["text"]}[/font][/size]'
-        f'[size={hijri_day_size}][font=FontDSEG7-Light]{formatted_dates["hijri_day"]["text"]}[/font][/size]'
-        f'[size={greg_weekday_size}][font=DalekBold]{formatted_dates["weekday"]["text"]}[/font][/size]'
-        f'[size={greg_day_size}][font=FontDSEG7-Light]{formatted_dates["day"]["text"]}[/font][/size]'
-        f'[size={greg_month_size}][font=GothicRegular]{formatted_dates["month"]["text"]}[/font][/size]'
-        f'[size={greg_year_size}][font=FontDSEG7-Light]{formatted_dates["year"]["text"]}[/font][/size]'
-    )
-    
-    # Обновляем текст метки
-    label.text = marked_text
-    label.texture_update()
\ No newline at end of file
+    return date_service.get_formatted_dates()
+
+def hijri_markup_size(window_width):
+    """Размер шрифта частей даты: 4% от ширины окна (он же ключ кэша разметки)"""
+    return int(window_width * 0.04)
@@ -1,7 +1,11 @@
+"""
+Сведения об экране и устройстве.
+
+Kivy импортируется внутри функций, которым нужно окно, поэтому импорт
+модуля не создает окно SDL.
+"""
 import logging
 import platform
-from kivy.core.window import Window
-from kivy.utils import platform as kivy_platform
 import subprocess
 import json
 
@@ -9,6 +13,7 @@ def get_monitor_info():
     """
     Возвращает базовую информацию о размере экрана
     """
+    from kivy.core.window import Window
     return [{
         'id': 0,
         'name': 'Screen',
@@ -29,6 +34,7 @@ def get_window_info():
     """
     Возвращает текущие координаты и размеры окна
     """
+    from kivy.core.window import Window
     return {
         'x': Window.left,
         'y': Window.top,
@@ -0,0 +1,198 @@
+"""
+Планировщик звуковых событий: азан, напоминание перед намазом, бой часов.
+
+Все предстоящие события лежат в куче по сроку на монотонных часах, и
+взведен ровно один Clock.schedule_once - на самое раннее из них.
+Добавление события перевзводит таймер, только если оно стало первым.
+
+Срок события задается моментом по стенным часам (азан в 12:31 по
+местному времени), а ждать удобнее по монотонным: их не двигают NTP и
+ручная установка времени. Связь между ними - разность "стенные минус
+монотонные". Если при срабатывании она изменилась (часы перевели или
+устройство спало, а монотонные часы во сне стоят), сроки всех событий
+пересчитываются от их моментов по стенным часам. Таймер никогда не
+взводится дольше MAX_SLEEP, поэтому скачок замечается не позже чем
+через минуту.
+
+Для каждого срабатывания записывается опоздание относительно срока;
+события, опоздавшие больше чем на STALE_AFTER (после долгого сна),
+не звучат, а отмечаются пропущенными.
+"""
+import heapq
+import itertools
+import time
+from collections import deque
+from logic.prayer_times import ADHAN_KEYS, PRAYER_KEYS, unwrap_day
+from logic.next_prayer import local_epoch
+
+# Наибольшая задержка таймера, секунды
+MAX_SLEEP = 60.0
+
+# Изменение разности стенных и монотонных часов, считающееся скачком, секунды
+JUMP_TOLERANCE = 1.0
+
+# Опоздание, после которого событие пропускается, секунды
+STALE_AFTER = 300.0
+
+# Записей об опоздании в журнале
+LATENESS_HISTORY = 256
+
+class ScheduledEvent:
+    """
+    Событие планировщика
+
+    Attributes:
+        wall_time (float): Момент по стенным часам (секунды Unix)
+        callback (callable): Вызывается как callback(event)
+        kind (str): 'adhan', 'reminder' или 'chime'
+        name (str): Ключ времени намаза или час боя
+        deadline (float): Срок на монотонных часах
+    """
+    __slots__ = ('wall_time', 'callback', 'kind', 'name', 'deadline', 'cancelled')
+
+    def __init__(self, wall_time, callback, kind='', name=''):
+        self.wall_time = wall_time
+        self.callback = callback
+        self.kind = kind
+        self.name = name
+        self.deadline = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Отменяет событие (запись остается в куче до своего срока)"""
+        self.cancelled = True
+
+class EventScheduler:
+    """
+    Куча событий с одним взведенным таймером
+
+    Args:
+        schedule_once (callable): Планировщик вида Clock.schedule_once(callback, delay)
+        clock (callable): Стенные часы, секунды Unix
+        monotonic (callable): Монотонные часы, секунды
+    """
+
+    def __init__(self, schedule_once, clock=time.time, monotonic=time.monotonic):
+        self._schedule_once = schedule_once
+        self._clock = clock
+        self._monotonic = monotonic
+        self._heap = []
+        self._sequence = itertools.count()
+        self._anchor = clock() - monotonic()
+        self._armed_deadline = None
+        self._event = None
+        # Тройки (событие, опоздание в секундах, прозвучало ли)
+        self.lateness = deque(maxlen=LATENESS_HISTORY)
+
+    def add(self, wall_time, callback, kind='', name=''):
+        """
+        Добавляет событие на момент wall_time
+
+        Returns:
+            ScheduledEvent: Событие или None, если момент уже прошел
+        """
+        if wall_time <= self._clock():
+            return None
+        event = ScheduledEvent(wall_time, callback, kind, name)
+        event.deadline = wall_time - self._anchor
+        heapq.heappush(self._heap, (event.deadline, next(self._sequence), event))
+        if self._armed_deadline is None or event.deadline < self._armed_deadline:
+            self._arm()
+        return event
+
+    def pending(self):
+        """Неотмененные события в порядке срока"""
+        return [entry[2] for entry in sorted(self._heap) if not entry[2].cancelled]
+
+    def clear(self):
+        """Удаляет все события и снимает таймер"""
+        self._heap = []
+        self.stop()
+
+    def stop(self):
+        """Снимает таймер (события остаются в куче)"""
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        self._armed_deadline = None
+
+    def _arm(self):
+        """Взводит единственный таймер на самое раннее событие"""
+        self.stop()
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+        self._armed_deadline = self._heap[0][0]
+        delay = min(max(self._armed_deadline - self._monotonic(), 0.0), MAX_SLEEP)
+        self._event = self._schedule_once(self._fire, delay)
+
+    def _reanchor(self):
+        """Пересчитывает сроки, если стенные часы сдвинулись относительно монотонных"""
+        anchor = self._clock() - self._monotonic()
+        if abs(anchor - self._anchor) <= JUMP_TOLERANCE:
+            return
+        self._anchor = anchor
+        for _, _, event in self._heap:
+            event.deadline = event.wall_time - anchor
+        self._heap = [(event.deadline, sequence, event) for _, sequence, event in self._heap]
+        heapq.heapify(self._heap)
+
+    def _fire(self, *args):
+        self._event = None
+        self._armed_deadline = None
+        self._reanchor()
+        now = self._monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, event = heapq.heappop(self._heap)
+            if event.cancelled:
+                continue
+            late = now - event.deadline
+            played = late <= STALE_AFTER
+            self.lateness.append((event, late, played))
+            if played:
+                event.callback(event)
+        self._arm()
+
+    def lateness_stats(self):
+        """
+        Returns:
+            tuple: (число срабатываний, среднее и наибольшее опоздание в секундах, пропущено)
+        """
+        if not self.lateness:
+            return 0, 0.0, 0.0, 0
+        values = [late for _, late, played in self.lateness if played]
+        missed = len(self.lateness) - len(values)
+        if not values:
+            return 0, 0.0, 0.0, missed
+        return len(values), sum(values) / len(values), max(values), missed
+
+def plan_day(day, times, zone=None, reminder_minutes=0, chime=False):
+    """
+    События одного местного дня
+
+    Args:
+        day (date): Дата
+        times (sequence): 7 времен в минутах (см. PRAYER_KEYS)
+        zone (OffsetTable): Таблица смещений (None - пояс системы)
+        reminder_minutes (int): За сколько минут до азана напоминать (0 - не напоминать)
+        chime (bool): Бой часов в начале каждого часа
+
+    Returns:
+        list: Тройки (момент Unix, вид, имя) по возрастанию момента
+    """
+    # Иша после полуночи звучит в ночь на следующую дату, а не утром этого дня
+    times = unwrap_day(times)
+    events = []
+    for key in ADHAN_KEYS:
+        minutes = times[PRAYER_KEYS.index(key)]
+        if minutes != minutes:  # NaN - времени нет (высокие широты)
+            continue
+        events.append((local_epoch(day, minutes, zone), 'adhan', key))
+        if reminder_minutes:
+            events.append((local_epoch(day, minutes - reminder_minutes, zone), 'reminder', key))
+    if chime:
+        for hour in range(24):
+            events.append((local_epoch(day, hour * 60, zone), 'chime', str(hour)))
+    return sorted(events)
+
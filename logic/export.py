@@ -0,0 +1,180 @@
+"""
+Потоковая выгрузка расписаний: CSV (имсакийе), ICS (азаны) и JSON.
+
+Дни выдаются генератором: движок считает по одному году за раз, а
+каждая строка, событие или объект сразу пишется в поток. Выгрузка
+десяти лет занимает в памяти столько же, сколько выгрузка одного дня
+(плюс массив одного года).
+
+Режим командной строки приложения:
+    python main.py export --format ics --start 2025-01-01 --years 10 -o azan.ics
+"""
+import argparse
+import csv
+import json
+import sys
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+from logic.prayer_times import (
+    ADHAN_KEYS, PRAYER_KEYS, compute_prayer_times, format_minutes, unwrap_day, year_days
+)
+from logic.hijri import hijri_calendar
+from logic.timezones import SECONDS_PER_DAY, offset_table
+
+# Названия событий календаря
+ADHAN_TITLES = {
+    'imsak': 'İmsak',
+    'dhuhr': 'Günorta',
+    'asr': 'İkindi',
+    'maghrib': 'Axşam',
+    'isha': 'Gecə'
+}
+
+FORMATS = ('csv', 'ics', 'json')
+
+# Порядковый номер даты 1970-01-01
+UNIX_EPOCH_ORDINAL = 719163
+
+def iter_days(settings, start, end):
+    """
+    Времена намаза по дням
+
+    Args:
+        settings (dict): Настройки из SettingsDatabase.get_calculation_settings
+        start (date): Первый день
+        end (date): День после последнего
+
+    Yields:
+        tuple: (дата, массив 7 времен в минутах от местной полуночи)
+    """
+    for year in range(start.year, end.year + 1):
+        first = max(start, date(year, 1, 1))
+        last = min(end, date(year + 1, 1, 1))
+        if first >= last:
+            continue
+        times = compute_prayer_times(year_days(year), **settings)
+        offset = first.timetuple().tm_yday - 1
+        for number in range((last - first).days):
+            yield first + timedelta(days=number), times[offset + number]
+
+def csv_rows(days):
+    """Строки имсакийе: дата, дата хиджры и семь времен"""
+    yield ('date', 'hijri') + PRAYER_KEYS
+    for day, times in days:
+        hijri_year, hijri_month, hijri_day = hijri_calendar.to_hijri(day)
+        yield (
+            (day.isoformat(), f"{hijri_year:04d}-{hijri_month:02d}-{hijri_day:02d}")
+            + tuple('' if np.isnan(minutes) else format_minutes(minutes) for minutes in times)
+        )
+
+def ics_lines(days, zone):
+    """
+    Строки календаря iCalendar: событие VEVENT на каждый азан
+
+    Время событий переводится в UTC по таблице смещений zone, поэтому
+    календари показывают его в поясе пользователя без описания пояса.
+    Иша после полуночи относится к следующей дате (см. unwrap_day).
+    """
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    yield 'BEGIN:VCALENDAR'
+    yield 'VERSION:2.0'
+    yield 'PRODID:-//Azan Clock//Prayer Times//AZ'
+    yield 'CALSCALE:GREGORIAN'
+    for day, times in days:
+        midnight = (day.toordinal() - UNIX_EPOCH_ORDINAL) * SECONDS_PER_DAY
+        times = unwrap_day(times)
+        for key in ADHAN_KEYS:
+            minutes = times[PRAYER_KEYS.index(key)]
+            if np.isnan(minutes):
+                continue
+            utc = int(zone.to_utc(midnight + round(float(minutes)) * 60))
+            moment = datetime.fromtimestamp(utc, timezone.utc)
+            yield 'BEGIN:VEVENT'
+            yield f'UID:{day.isoformat()}-{key}@azan-clock'
+            yield f'DTSTAMP:{stamp}'
+            yield f"DTSTART:{moment.strftime('%Y%m%dT%H%M%SZ')}"
+            yield 'DURATION:PT5M'
+            yield f'SUMMARY:{ADHAN_TITLES[key]}'
+            yield 'END:VEVENT'
+    yield 'END:VCALENDAR'
+
+def json_chunks(days):
+    """Массив JSON по частям: один объект на день"""
+    yield '['
+    separator = '\n'
+    for day, times in days:
+        record = {'date': day.isoformat()}
+        record.update(
+            (key, None if np.isnan(minutes) else format_minutes(minutes))
+            for key, minutes in zip(PRAYER_KEYS, times)
+        )
+        yield separator + json.dumps(record, ensure_ascii=False)
+        separator = ',\n'
+    yield '\n]\n'
+
+def write_export(stream, fmt, settings, start, end):
+    """
+    Пишет выгрузку в открытый текстовый поток
+
+    Returns:
+        int: Число выгруженных дней
+    """
+    count = 0
+
+    def counted():
+        nonlocal count
+        for item in iter_days(settings, start, end):
+            count += 1
+            yield item
+
+    if fmt == 'csv':
+        csv.writer(stream).writerows(csv_rows(counted()))
+    elif fmt == 'ics':
+        zone = offset_table(settings, start.year, end.year)
+        for line in ics_lines(counted(), zone):
+            # iCalendar требует CRLF в конце строк
+            stream.write(line + '\r\n')
+    elif fmt == 'json':
+        for chunk in json_chunks(counted()):
+            stream.write(chunk)
+    else:
+        raise ValueError(f"Неизвестный формат выгрузки: {fmt}")
+    return count
+
+def main(argv=None, settings=None):
+    """
+    Режим выгрузки из командной строки
+
+    Args:
+        argv (list): Аргументы после 'export'
+        settings (dict): Настройки расчета (по умолчанию из базы настроек)
+    """
+    parser = argparse.ArgumentParser(prog='main.py export', description="Выгрузка расписания намаза")
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--start', type=date.fromisoformat, default=date.today().replace(day=1))
+    parser.add_argument('--days', type=int, default=None, help="Число дней (по умолчанию месяц)")
+    parser.add_argument('--years', type=int, default=None, help="Число лет вместо --days")
+    parser.add_argument('-o', '--output', default='-', help="Файл (по умолчанию stdout)")
+    args = parser.parse_args(argv)
+
+    if args.years:
+        try:
+            end = args.start.replace(year=args.start.year + args.years)
+        except ValueError:
+            # 29 февраля в невисокосный год
+            end = args.start.replace(year=args.start.year + args.years, day=28)
+    elif args.days:
+        end = args.start + timedelta(days=args.days)
+    else:
+        end = (args.start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    if settings is None:
+        from data.database import SettingsDatabase
+        settings = SettingsDatabase().get_calculation_settings()
+
+    if args.output == '-':
+        write_export(sys.stdout, args.format, settings, args.start, end)
+    else:
+        with open(args.output, 'w', newline='', encoding='utf-8') as stream:
+            write_export(stream, args.format, settings, args.start, end)
+    return 0
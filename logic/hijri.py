@@ -0,0 +1,106 @@
+"""
+Перевод дат в календарь хиджры по таблице начал месяцев.
+
+Календарь задается отсортированным массивом юлианских номеров дней
+(JDN) первого числа каждого месяца. Перевод даты - это бинарный поиск
+месяца и одно вычитание, без итеративной арифметики. По умолчанию
+таблица строится по табличному (арифметическому) календарю на
+1300-1600 годы хиджры; ее можно заменить таблицей по наблюдениям
+молодой луны.
+"""
+from bisect import bisect_right
+from datetime import date
+import numpy as np
+
+# Диапазон таблицы по умолчанию (годы хиджры включительно)
+FIRST_YEAR = 1300
+LAST_YEAR = 1600
+
+# JDN 1 мухаррама 1 года хиджры (гражданская эпоха, 16 июля 622)
+HIJRI_EPOCH_JDN = 1948440
+
+# Сдвиги: порядковый номер даты Python и дни от 1970-01-01 в JDN
+ORDINAL_TO_JDN = 1721425
+UNIX_EPOCH_JDN = 2440588
+
+def tabular_month_starts(first_year=FIRST_YEAR, last_year=LAST_YEAR):
+    """
+    JDN начал месяцев табличного календаря (високосные годы 2, 5, 7, 10,
+    13, 16, 18, 21, 24, 26, 29 тридцатилетнего цикла)
+
+    Returns:
+        np.ndarray: (last_year - first_year + 1) * 12 + 1 значений,
+                    последнее - начало месяца после таблицы
+    """
+    index = np.arange((last_year - first_year + 1) * 12 + 1)
+    year = first_year + index // 12
+    month = index % 12 + 1
+    return (
+        np.ceil(29.5 * (month - 1)).astype(np.int64)
+        + (year - 1) * 354
+        + (3 + 11 * year) // 30
+        + HIJRI_EPOCH_JDN
+    )
+
+class HijriCalendar:
+    """
+    Календарь хиджры поверх таблицы начал месяцев
+
+    Args:
+        month_starts (sequence): JDN первого числа каждого месяца подряд,
+                                 последний элемент - конец таблицы
+        first_year (int): Год хиджры первого месяца таблицы
+    """
+
+    def __init__(self, month_starts, first_year=FIRST_YEAR):
+        self.month_starts = np.asarray(month_starts, dtype=np.int64)
+        self.first_year = first_year
+        # Список для bisect при одиночном переводе (быстрее, чем вызов NumPy)
+        self._starts = self.month_starts.tolist()
+
+    def to_hijri(self, day):
+        """
+        Переводит дату в календарь хиджры
+
+        Args:
+            day (date): Григорианская дата
+
+        Returns:
+            tuple: (год, месяц, число)
+        """
+        jdn = day.toordinal() + ORDINAL_TO_JDN
+        index = bisect_right(self._starts, jdn) - 1
+        if index < 0 or index >= len(self._starts) - 1:
+            raise ValueError(f"Дата вне таблицы календаря хиджры: {day}")
+        return (
+            self.first_year + index // 12,
+            index % 12 + 1,
+            jdn - self._starts[index] + 1
+        )
+
+    def to_hijri_array(self, days):
+        """
+        Переводит массив дат (datetime64 или date) в календарь хиджры
+
+        Returns:
+            tuple: Массивы (годы, месяцы, числа); вне таблицы - ValueError
+        """
+        jdn = np.asarray(days, dtype='datetime64[D]').astype(np.int64) + UNIX_EPOCH_JDN
+        index = np.searchsorted(self.month_starts, jdn, side='right') - 1
+        if np.any(index < 0) or np.any(index >= len(self.month_starts) - 1):
+            raise ValueError("Даты вне таблицы календаря хиджры")
+        return (
+            self.first_year + index // 12,
+            index % 12 + 1,
+            jdn - self.month_starts[index] + 1
+        )
+
+    def from_hijri(self, year, month, day):
+        """Переводит дату хиджры в григорианскую"""
+        index = (year - self.first_year) * 12 + month - 1
+        if index < 0 or index >= len(self._starts) - 1:
+            raise ValueError(f"Месяц вне таблицы календаря хиджры: {year}/{month}")
+        return date.fromordinal(self._starts[index] + day - 1 - ORDINAL_TO_JDN)
+
+# Календарь приложения по умолчанию
+hijri_calendar = HijriCalendar(tabular_month_starts())
@@ -0,0 +1,102 @@
+"""
+Поиск следующего времени намаза.
+
+Времена сегодняшнего и завтрашнего дня переводятся в отсортированный
+массив моментов (секунды Unix). Следующее время находится бинарным
+поиском, а момент следующей перерисовки обратного отсчета вычисляется
+заранее, поэтому опрашивать часы не нужно.
+"""
+import math
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+
+# Столбец Gecə в строке времен (см. logic.prayer_times.PRAYER_KEYS)
+ISHA_COLUMN = 6
+
+# Порядковый номер даты 1970-01-01
+UNIX_EPOCH_ORDINAL = 719163
+
+def local_epoch(day, minutes, zone=None):
+    """
+    Момент Unix для местного времени minutes дня day
+
+    Args:
+        zone (OffsetTable): Таблица смещений (None - пояс системы)
+    """
+    if zone is None:
+        return datetime.combine(day, time()).timestamp() + minutes * 60.0
+    local = (day.toordinal() - UNIX_EPOCH_ORDINAL) * 86400 + minutes * 60.0
+    return float(zone.to_utc(local))
+
+def day_epochs(day, times, zone=None):
+    """
+    Переводит минуты от полуночи в моменты Unix
+
+    Args:
+        day (date): Дата
+        times (sequence): 7 времен в минутах (NaN пропускаются)
+        zone (OffsetTable): Таблица смещений (None - пояс системы)
+
+    Returns:
+        list: Пары (момент, номер столбца)
+    """
+    return [
+        (local_epoch(day, minutes, zone), column)
+        for column, minutes in enumerate(times)
+        if not math.isnan(minutes)
+    ]
+
+class PrayerSchedule:
+    """
+    Отсортированные моменты намаза на сегодня и завтра
+
+    Args:
+        day (date): Сегодняшняя дата
+        today_times (sequence): Времена на сегодня в минутах
+        tomorrow_times (sequence): Времена на завтра в минутах
+        zone (OffsetTable): Таблица смещений (None - пояс системы)
+    """
+
+    def __init__(self, day, today_times, tomorrow_times, zone=None):
+        self.day = day
+        tomorrow = day + timedelta(days=1)
+        pairs = sorted(day_epochs(day, today_times, zone) + day_epochs(tomorrow, tomorrow_times, zone))
+        self.epochs = [epoch for epoch, _ in pairs]
+        self.columns = [column for _, column in pairs]
+        self.valid_until = local_epoch(tomorrow, 0, zone)
+
+    def next_index(self, now):
+        """Индекс ближайшего момента строго после now"""
+        return bisect_right(self.epochs, now)
+
+    def current_column(self, now):
+        """
+        Столбец текущего времени намаза
+
+        До первого времени дня продолжается Gecə предыдущего дня.
+        """
+        index = self.next_index(now)
+        if index == 0:
+            return ISHA_COLUMN
+        return self.columns[index - 1]
+
+    def countdown(self, now):
+        """
+        Оставшееся время до следующего намаза
+
+        Returns:
+            tuple: (оставшиеся минуты с округлением вверх,
+                    секунды до смены отображаемого значения) или (None, None)
+        """
+        index = self.next_index(now)
+        if index >= len(self.epochs):
+            return None, None
+        remaining = self.epochs[index] - now
+        minutes = math.ceil(remaining / 60.0)
+        return minutes, remaining - (minutes - 1) * 60.0
+
+def format_countdown(minutes):
+    """Форматирует оставшиеся минуты в ЧЧ:ММ"""
+    if minutes is None:
+        return '--:--'
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
@@ -0,0 +1,163 @@
+"""
+Многоуровневый кэш времен намаза.
+
+Уровни: LRU в памяти -> строка дня из файла расписаний (mmap) ->
+таблица prayer_times в SQLite -> перерасчет. При промахе
+рассчитывается сразу весь год и сохраняется одной транзакцией,
+поэтому обычный день никогда не вызывает перерасчет.
+"""
+import math
+from collections import OrderedDict
+from datetime import date
+
+# Части ключа кэша и настройки, от которых они зависят
+KEY_COMPONENTS = {
+    'location': ('latitude', 'longitude', 'elevation', 'utc_offset', 'timezone'),
+    'method': ('method',),
+    'madhab': ('madhab',),
+    'offsets': ('offsets',)
+}
+
+def location_component(settings):
+    """Строка места для ключа кэша: координаты, высота, смещение от UTC и пояс"""
+    return (
+        f"{settings['latitude']:.4f},{settings['longitude']:.4f},"
+        f"{settings['elevation']:g},{settings['utc_offset']:g},{settings.get('timezone', '')}"
+    )
+
+def key_components(settings):
+    """
+    Части ключа кэша, кроме даты
+
+    Returns:
+        dict: {location, method, madhab, offsets: str}
+    """
+    return {
+        'location': location_component(settings),
+        'method': settings['method'],
+        'madhab': settings['madhab'],
+        'offsets': ','.join(str(value) for value in settings['offsets'])
+    }
+
+def encode_times(times):
+    """Минуты через запятую, пустая строка для отсутствующего времени"""
+    return ','.join('' if math.isnan(value) else str(int(round(value))) for value in times)
+
+def decode_times(text):
+    """Обратное преобразование encode_times"""
+    return tuple(float(value) if value else math.nan for value in text.split(','))
+
+class PrayerTimesCache:
+    """
+    Кэш времен намаза на день
+
+    Args:
+        db (SettingsDatabase): База настроек с таблицей prayer_times
+        compute_year (callable): (year, settings) -> матрица (дни года, 7) в минутах
+        maxsize (int): Размер LRU в памяти (в днях)
+        read_day (callable): (day, settings) -> 7 времен из файла расписаний или None
+    """
+
+    def __init__(self, db, compute_year, maxsize=32, read_day=None):
+        self.db = db
+        self.compute_year = compute_year
+        self.maxsize = maxsize
+        self.read_day = read_day
+        self.settings = db.get_calculation_settings()
+        self.components = key_components(self.settings)
+        self._memory = OrderedDict()
+
+        # Счетчики попаданий по уровням
+        self.stats = {
+            'memory_hits': 0,
+            'file_hits': 0,
+            'db_hits': 0,
+            'misses': 0
+        }
+
+    def _key(self, day):
+        components = self.components
+        return (
+            day.isoformat(),
+            components['location'],
+            components['method'],
+            components['madhab'],
+            components['offsets']
+        )
+
+    def _remember(self, key, times):
+        """Кладет значение в LRU и вытесняет самое старое"""
+        self._memory[key] = times
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, day):
+        """
+        Возвращает 7 времен дня в минутах от полуночи
+
+        Args:
+            day (date): Дата
+
+        Returns:
+            tuple: Минуты (NaN - время отсутствует)
+        """
+        key = self._key(day)
+
+        times = self._memory.get(key)
+        if times is not None:
+            self._memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return times
+
+        if self.read_day is not None:
+            times = self.read_day(day, self.settings)
+            if times is not None:
+                self.stats['file_hits'] += 1
+                self._remember(key, times)
+                return times
+
+        cached = self.db.get_cached_prayer_times(key)
+        if cached is not None:
+            self.stats['db_hits'] += 1
+            times = decode_times(cached)
+            self._remember(key, times)
+            return times
+
+        # Промах: считаем весь год и сохраняем его целиком
+        self.stats['misses'] += 1
+        year_times = self.compute_year(day.year, self.settings)
+        start = date(day.year, 1, 1).toordinal()
+        rows = []
+        for number, row in enumerate(year_times):
+            row_key = (date.fromordinal(start + number).isoformat(),) + key[1:]
+            encoded = encode_times(row)
+            rows.append(row_key + (encoded,))
+            if row_key == key:
+                times = decode_times(encoded)
+        self.db.save_cached_prayer_times(rows)
+
+        self._remember(key, times)
+        return times
+
+    def apply_settings(self, values):
+        """
+        Сохраняет настройки расчета и сбрасывает записи прежнего ключа
+
+        Удаляются только записи прежнего ключа (все его даты); записи
+        остальных наборов настроек не трогаются.
+
+        Args:
+            values (dict): {ключ настройки: значение в том виде, в каком оно хранится в settings}
+        """
+        for name, value in values.items():
+            self.db.save_setting(name, value)
+        old_components = self.components
+        self.settings = self.db.get_calculation_settings()
+        self.components = key_components(self.settings)
+        if old_components == self.components:
+            return
+
+        self.db.delete_cached_prayer_times(tuple(old_components[column] for column in KEY_COMPONENTS))
+        # В памяти лежат только дни прежнего ключа
+        self._memory.clear()
@@ -0,0 +1,326 @@
+"""
+Векторизованный расчет времен намаза.
+
+Все функции работают с массивами NumPy: на вход подается массив дней,
+на выходе получается матрица (дни x 7 времен) в минутах от местной
+полуночи. Цикла по дням на Python нет, поэтому год для одного города
+считается за несколько миллисекунд.
+"""
+import hashlib
+import json
+import numpy as np
+from logic.solar_ephemeris import sun_position
+from logic.timezones import SECONDS_PER_DAY, offset_table
+
+# Порядок столбцов в матрице времен
+PRAYER_KEYS = (
+    'tahajjud',  # Təhəccüd - начало последней трети ночи
+    'imsak',     # İmsak - утренняя заря
+    'sunrise',   # Günəş - восход
+    'dhuhr',     # Günorta - полдень
+    'asr',       # İkindi - послеполуденная
+    'maghrib',   # Axşam - закат
+    'isha'       # Gecə - ночная
+)
+
+# Времена, для которых звучит азан (календарь ICS, планировщик звуков)
+ADHAN_KEYS = ('imsak', 'dhuhr', 'asr', 'maghrib', 'isha')
+
+# Методы расчета: угол солнца для İmsak и угол (или минуты после заката) для Gecə
+CALCULATION_METHODS = {
+    'MWL': {'fajr': 18.0, 'isha': 17.0},
+    'ISNA': {'fajr': 15.0, 'isha': 15.0},
+    'Egyptian': {'fajr': 19.5, 'isha': 17.5},
+    'UmmAlQura': {'fajr': 18.5, 'isha_minutes': 90.0},
+    'Karachi': {'fajr': 18.0, 'isha': 18.0},
+    'Diyanet': {'fajr': 18.0, 'isha': 17.0}
+}
+
+# Множитель длины тени для İkindi
+ASR_FACTORS = {
+    'standard': 1,  # Шафии, Малики, Ханбали
+    'hanafi': 2     # Ханафи
+}
+
+# Юлианская дата 1970-01-01 00:00 UTC
+UNIX_EPOCH_JD = 2440587.5
+
+# Приблизительное местное время событий (в часах) для уточнения положения солнца
+_APPROX_HOURS = np.array([5.0, 6.0, 12.0, 13.0, 18.0, 18.0])
+
+def to_days(days):
+    """
+    Приводит даты к массиву дней от 1970-01-01
+
+    Args:
+        days: date, datetime64 или массив из них
+
+    Returns:
+        np.ndarray: Массив int64
+    """
+    return np.atleast_1d(np.asarray(days, dtype='datetime64[D]')).astype(np.int64)
+
+def year_days(year):
+    """Возвращает массив datetime64[D] со всеми днями года"""
+    return np.arange(
+        np.datetime64(f'{year:04d}-01-01'),
+        np.datetime64(f'{year + 1:04d}-01-01'),
+        dtype='datetime64[D]'
+    )
+
+def _hour_angle(angle, declination, latitude):
+    """
+    Часовой угол (в часах), при котором солнце опускается на angle градусов
+    ниже горизонта. Для недостижимых углов возвращает NaN.
+    """
+    decl = np.radians(declination)
+    lat = np.radians(latitude)
+    cos_h = (-np.sin(np.radians(angle)) - np.sin(decl) * np.sin(lat)) / (np.cos(decl) * np.cos(lat))
+    with np.errstate(invalid='ignore'):
+        return np.degrees(np.arccos(cos_h)) / 15.0
+
+def _asr_hour_angle(factor, declination, latitude):
+    """Часовой угол İkindi для заданного множителя тени"""
+    angle = -np.degrees(np.arctan(1.0 / (factor + np.tan(np.radians(np.abs(latitude - declination))))))
+    return _hour_angle(angle, declination, latitude)
+
+def compute_times(days, latitude, longitude, utc_offset=0.0, elevation=0.0,
+                  fajr_angle=18.0, isha_angle=17.0, isha_minutes=np.nan, asr_factor=1):
+    """
+    Рассчитывает все семь времен для массива дней
+
+    Параметры метода (fajr_angle, isha_angle, isha_minutes, asr_factor)
+    могут быть массивами: они транслируются по правилам NumPy на оси
+    после оси дней.
+
+    Args:
+        days: Даты (см. to_days)
+        latitude (float): Широта в градусах
+        longitude (float): Долгота в градусах (восток положительный)
+        utc_offset: Смещение от UTC в часах (скаляр или по дням) или
+                    OffsetTable - тогда смещение берется на момент каждого времени
+        elevation (float): Высота над уровнем моря в метрах
+        fajr_angle: Угол солнца для İmsak
+        isha_angle: Угол солнца для Gecə
+        isha_minutes: Минуты после заката для Gecə (NaN - используется угол)
+        asr_factor: Множитель длины тени для İkindi
+
+    Returns:
+        np.ndarray: Матрица (дни, ..., 7) в минутах от местной полуночи
+    """
+    day_numbers = to_days(days)
+    extra_dims = np.broadcast(
+        np.asarray(fajr_angle), np.asarray(isha_angle),
+        np.asarray(isha_minutes), np.asarray(asr_factor)
+    ).ndim
+
+    # Юлианская дата местного полудня по среднему солнечному времени
+    jd = day_numbers + UNIX_EPOCH_JD - longitude / 360.0
+
+    # Положение солнца для каждого события в приблизительный момент
+    declination, eqt = sun_position(jd[:, None] + _APPROX_HOURS / 24.0)
+    declination = declination.reshape(declination.shape[:1] + (1,) * extra_dims + declination.shape[1:])
+    eqt = eqt.reshape(declination.shape)
+
+    def column(index):
+        return declination[..., index], eqt[..., index]
+
+    # Ниже уровня моря (Мертвое море, Баку) понижения горизонта нет
+    sunrise_angle = 0.833 + 0.0347 * np.sqrt(np.maximum(elevation, 0.0))
+
+    # Полдень в UTC, затем каждое событие отсчитывается от своего полудня
+    def noon(index):
+        return 12.0 - longitude / 15.0 - column(index)[1]
+
+    fajr = noon(0) - _hour_angle(fajr_angle, column(0)[0], latitude)
+    sunrise = noon(1) - _hour_angle(sunrise_angle, column(1)[0], latitude)
+    dhuhr = noon(2)
+    asr = noon(3) + _asr_hour_angle(asr_factor, column(3)[0], latitude)
+    sunset = noon(4) + _hour_angle(sunrise_angle, column(4)[0], latitude)
+    isha = noon(5) + _hour_angle(isha_angle, column(5)[0], latitude)
+    isha = np.where(np.isnan(isha_minutes), isha, sunset + np.nan_to_num(isha_minutes) / 60.0)
+
+    # Высокие широты: İmsak и Gecə не позже доли ночи, пропорциональной углу
+    night = sunrise + 24.0 - sunset
+    fajr_limit = sunrise - np.asarray(fajr_angle) / 60.0 * night
+    fajr = np.where(np.isnan(fajr) | (fajr < fajr_limit), fajr_limit, fajr)
+    isha_limit = sunset + np.asarray(isha_angle) / 60.0 * night
+    isha = np.where(np.isnan(isha_minutes) & (np.isnan(isha) | (isha > isha_limit)), isha_limit, isha)
+
+    # Təhəccüd - начало последней трети ночи перед İmsak
+    tahajjud = fajr - (fajr + 24.0 - sunset) / 3.0
+
+    times = np.stack(np.broadcast_arrays(tahajjud, fajr, sunrise, dhuhr, asr, sunset, isha), axis=-1)
+
+    # Переводим в местное время и минуты от полуночи
+    if hasattr(utc_offset, 'offsets_at'):
+        # Таблица переходов: момент UTC каждого времени, searchsorted и сложение
+        midnight = day_numbers.reshape(day_numbers.shape + (1,) * (times.ndim - 1)) * SECONDS_PER_DAY
+        instants = midnight + np.nan_to_num(times) * 3600.0
+        return ((times + utc_offset.offsets_at(instants) / 3600.0) % 24.0) * 60.0
+    offset = np.asarray(utc_offset, dtype=np.float64)
+    offset = offset.reshape(offset.shape + (1,) * (times.ndim - offset.ndim))
+    return ((times + offset) % 24.0) * 60.0
+
+class PrayerTimetable:
+    """
+    Времена намаза с подписанными осями: (дни, методы, мазхабы, времена)
+
+    Attributes:
+        values (np.ndarray): Минуты от местной полуночи
+        days (np.ndarray): Даты datetime64[D]
+        methods (tuple): Имена методов из CALCULATION_METHODS
+        madhabs (tuple): Имена мазхабов из ASR_FACTORS
+        prayers (tuple): PRAYER_KEYS
+    """
+
+    def __init__(self, values, days, methods, madhabs):
+        self.values = values
+        self.days = days
+        self.methods = tuple(methods)
+        self.madhabs = tuple(madhabs)
+        self.prayers = PRAYER_KEYS
+
+    def select(self, method=None, madhab=None, prayer=None):
+        """
+        Срез по подписям осей (None - ось остается целиком)
+
+        Returns:
+            np.ndarray: Срез values без выбранных осей
+        """
+        index = (
+            slice(None),
+            slice(None) if method is None else self.methods.index(method),
+            slice(None) if madhab is None else self.madhabs.index(madhab),
+            slice(None) if prayer is None else self.prayers.index(prayer)
+        )
+        return self.values[index]
+
+    def spread(self):
+        """Разброс (максимум - минимум) каждого времени по методам и мазхабам, минуты"""
+        values = self.values.reshape(self.values.shape[0], -1, self.values.shape[-1])
+        return np.nanmax(values, axis=1) - np.nanmin(values, axis=1)
+
+def compute_timetable(days, latitude, longitude, utc_offset=0.0, elevation=0.0,
+                      methods=None, madhabs=None, offsets=None, timezone=''):
+    """
+    Рассчитывает времена сразу для всех сочетаний методов и мазхабов
+
+    Параметры методов и множители тени собираются в массивы и
+    транслируются в одном вызове compute_times вместо отдельного
+    расчета для каждой пары.
+
+    Args:
+        methods (sequence): Имена методов (по умолчанию все)
+        madhabs (sequence): Имена мазхабов (по умолчанию все)
+        offsets (list): Поправки в минутах для каждого из 7 времен
+        timezone (str): Пояс IANA; если задан, смещение с учетом летнего
+                        времени берется из его таблицы переходов вместо utc_offset
+
+    Returns:
+        PrayerTimetable: Тензор (дни, методы, мазхабы, 7)
+    """
+    methods = tuple(methods or CALCULATION_METHODS)
+    madhabs = tuple(madhabs or ASR_FACTORS)
+    day_numbers = to_days(days)
+    if timezone:
+        years = day_numbers.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+        utc_offset = offset_table(
+            {'timezone': timezone, 'utc_offset': utc_offset}, int(years.min()), int(years.max())
+        )
+    params = [CALCULATION_METHODS[method] for method in methods]
+
+    times = compute_times(
+        day_numbers.astype('datetime64[D]'), latitude, longitude,
+        utc_offset=utc_offset,
+        elevation=elevation,
+        fajr_angle=np.array([p['fajr'] for p in params])[:, None],
+        isha_angle=np.array([p.get('isha', 0.0) for p in params])[:, None],
+        isha_minutes=np.array([p.get('isha_minutes', np.nan) for p in params])[:, None],
+        asr_factor=np.array([ASR_FACTORS[madhab] for madhab in madhabs])[None, :]
+    )
+    if offsets is not None:
+        times = (times + np.asarray(offsets, dtype=np.float64)) % 1440.0
+
+    return PrayerTimetable(times, day_numbers.astype('datetime64[D]'), methods, madhabs)
+
+def compute_prayer_times(days, latitude, longitude, utc_offset=0.0, elevation=0.0,
+                         method='MWL', madhab='standard', offsets=None, timezone=''):
+    """
+    Рассчитывает времена намаза по имени метода и мазхаба
+
+    Args:
+        offsets (list): Поправки в минутах для каждого из 7 времен
+
+    Returns:
+        np.ndarray: Матрица (дни, 7) в минутах от местной полуночи
+    """
+    return compute_timetable(
+        days, latitude, longitude,
+        utc_offset=utc_offset,
+        elevation=elevation,
+        methods=(method,),
+        madhabs=(madhab,),
+        offsets=offsets,
+        timezone=timezone
+    ).select(method, madhab)
+
+def format_minutes(minutes):
+    """Форматирует минуты от полуночи в строку ЧЧ:ММ"""
+    if minutes is None or np.isnan(minutes):
+        return '--:--'
+    total = int(round(float(minutes))) % 1440
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+def unwrap_day(times):
+    """
+    Снимает свертку по модулю суток с 7 времен одного дня
+
+    Времена после зухра, попавшие за полночь (иша летом на высоких
+    широтах), получают +1440 минут, времена до зухра, попавшие на
+    предыдущий вечер, -1440.
+
+    Args:
+        times (sequence): 7 времен в минутах (см. PRAYER_KEYS)
+
+    Returns:
+        list: Минуты от местной полуночи дня (могут выходить за 0..1440)
+    """
+    noon = PRAYER_KEYS.index('dhuhr')
+    dhuhr = times[noon]
+    result = []
+    for index, minutes in enumerate(times):
+        if index > noon and minutes < dhuhr:
+            minutes += 1440
+        elif index < noon and minutes > dhuhr:
+            minutes -= 1440
+        result.append(minutes)
+    return result
+
+def calculation_key(settings):
+    """
+    Короткий ключ набора настроек расчета (для файлов расписаний и кэша)
+
+    Args:
+        settings (dict): Настройки из SettingsDatabase.get_calculation_settings
+
+    Returns:
+        str: 16 шестнадцатеричных символов
+    """
+    payload = json.dumps(settings, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+if __name__ == '__main__':
+    import sys
+
+    # Сравнение всех методов и мазхабов на дату: python -m logic.prayer_times 2025-06-21 40.41 49.87 4
+    day = np.datetime64(sys.argv[1]) if len(sys.argv) > 1 else np.datetime64('today')
+    latitude, longitude, utc_offset = (float(value) for value in (sys.argv[2:5] or (40.4093, 49.8671, 4)))
+    timetable = compute_timetable(day, latitude, longitude, utc_offset=utc_offset)
+
+    print(f"{'':<20}" + ''.join(f"{prayer:>10}" for prayer in timetable.prayers))
+    for method in timetable.methods:
+        for madhab in timetable.madhabs:
+            row = timetable.select(method, madhab)[0]
+            print(f"{method + '/' + madhab:<20}" + ''.join(f"{format_minutes(m):>10}" for m in row))
+    print(f"{'разброс, мин':<20}" + ''.join(f"{m:>10.0f}" for m in timetable.spread()[0]))
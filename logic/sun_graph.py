@@ -0,0 +1,105 @@
+"""
+Кривая высоты солнца за местные сутки для графика дня.
+
+Кривая считается одним вызовом NumPy на весь день (положение солнца из
+эфемериды, как у движка расчета) и переводится в вершины один раз:
+в полночь или при изменении размера графика. На минутном тике
+пересчитывается только точка "сейчас" - интерполяцией по готовой
+кривой.
+"""
+import numpy as np
+from logic.prayer_times import UNIX_EPOCH_JD
+from logic.solar_ephemeris import sun_position
+from logic.timezones import SECONDS_PER_DAY
+
+# Отсчетов кривой за сутки (шаг 5 минут, последний - следующая полночь)
+CURVE_SAMPLES = 289
+
+# Минут в сутках
+MINUTES_PER_DAY = 1440
+
+# Порядковый номер даты 1970-01-01
+UNIX_EPOCH_ORDINAL = 719163
+
+def altitude_curve(day, latitude, longitude, zone, samples=CURVE_SAMPLES):
+    """
+    Высота центра солнца над горизонтом в течение местных суток
+
+    Args:
+        day (date): Местная дата
+        latitude (float): Широта в градусах
+        longitude (float): Долгота в градусах (восток положительный)
+        zone (OffsetTable): Таблица смещений пояса
+
+    Returns:
+        tuple: (минуты от местной полуночи, высота в градусах)
+    """
+    minutes = np.linspace(0.0, MINUTES_PER_DAY, samples)
+    midnight = (day.toordinal() - UNIX_EPOCH_ORDINAL) * SECONDS_PER_DAY
+    utc = zone.to_utc(midnight + minutes * 60.0)
+
+    declination, eqt = sun_position(utc / SECONDS_PER_DAY + UNIX_EPOCH_JD)
+
+    # Часовой угол по истинному солнечному времени
+    solar_hours = (utc % SECONDS_PER_DAY) / 3600.0 + longitude / 15.0 + eqt
+    hour_angle = np.radians((solar_hours - 12.0) * 15.0)
+    phi = np.radians(latitude)
+    delta = np.radians(declination)
+    altitude = np.arcsin(
+        np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.cos(hour_angle)
+    )
+    return minutes, np.degrees(altitude)
+
+class GraphScale:
+    """
+    Перевод (минуты, высота) в координаты графика
+
+    По горизонтали - сутки на всю ширину, по вертикали - горизонт
+    посередине и наибольшая высота кривой (по модулю) у края.
+    """
+
+    def __init__(self, curve, x, y, width, height):
+        minutes, altitudes = curve
+        self.x = x
+        self.width = width
+        self.center_y = y + height / 2.0
+        self.y_scale = height / 2.0 / max(float(np.abs(altitudes).max()), 1.0)
+
+    def points(self, minutes, altitudes):
+        """Массив (N, 2) координат"""
+        return np.column_stack([
+            self.x + np.asarray(minutes) / MINUTES_PER_DAY * self.width,
+            self.center_y + np.asarray(altitudes) * self.y_scale
+        ])
+
+def curve_points(curve, scale):
+    """Вершины кривой подряд (x0, y0, x1, y1, ...) для Line"""
+    return scale.points(*curve).ravel()
+
+def mark_vertices(curve, times, scale):
+    """
+    Вершины отрезков для Mesh в режиме 'lines': линия горизонта
+    и отрезки от горизонта до кривой в каждом времени намаза
+
+    Args:
+        times (np.ndarray): Времена в минутах от местной полуночи (NaN пропускаются)
+
+    Returns:
+        np.ndarray: Вершины (x, y, u, v) подряд
+    """
+    times = np.asarray(times, dtype=np.float64)
+    times = times[~np.isnan(times)]
+    minutes, altitudes = curve
+    ends = np.empty((len(times) + 1, 2, 2))
+    ends[0] = scale.points([0.0, MINUTES_PER_DAY], [0.0, 0.0])
+    ends[1:, 0] = scale.points(times, np.zeros_like(times))
+    ends[1:, 1] = scale.points(times, np.interp(times, minutes, altitudes))
+
+    vertices = np.zeros((ends.shape[0] * 2, 4))
+    vertices[:, :2] = ends.reshape(-1, 2)
+    return vertices.ravel()
+
+def marker_point(curve, minute, scale):
+    """Координаты точки "сейчас" на кривой"""
+    minutes, altitudes = curve
+    return tuple(scale.points([minute], [np.interp(minute, minutes, altitudes)])[0])
@@ -0,0 +1,123 @@
+"""
+Единый источник тиков часов.
+
+Вместо нескольких Clock.schedule_interval(..., 0.5), которые со временем
+уходят относительно настоящей секунды, один сервис планирует следующий
+вызов точно на ближайшую границу полусекунды по системным часам и
+раздает подписчикам один и тот же момент времени.
+
+Подписчики выбирают частоту:
+    'tick'   - каждые полсекунды (мигание двоеточия)
+    'second' - при смене секунды
+    'minute' - при смене минуты (обратный отсчет)
+    'day'    - при смене даты (даты, таблица намаза)
+"""
+import math
+import time
+from datetime import datetime
+
+# Интервал тика в секундах
+TICK_INTERVAL = 0.5
+
+# Частоты от крупной к мелкой: в этом порядке вызываются подписчики
+GRANULARITIES = ('day', 'minute', 'second', 'tick')
+
+# Допуск на раннее срабатывание планировщика
+EARLY_TOLERANCE = 0.002
+
+def _period_keys(moment):
+    """Значения, по смене которых срабатывает каждая частота"""
+    return {
+        'day': moment.date(),
+        'minute': moment.replace(second=0, microsecond=0),
+        'second': moment.replace(microsecond=0),
+        'tick': moment
+    }
+
+class TickService:
+    """
+    Диспетчер тиков, выровненных по границам полусекунды
+
+    Args:
+        schedule_once (callable): Планировщик вида Clock.schedule_once(callback, delay)
+        clock (callable): Источник текущего времени в секундах Unix
+        to_local (callable): Момент Unix -> местный datetime
+                             (например, OffsetTable.datetime_at)
+    """
+
+    def __init__(self, schedule_once, clock=time.time, to_local=datetime.fromtimestamp):
+        self._schedule_once = schedule_once
+        self._clock = clock
+        self._to_local = to_local
+        self._subscribers = {granularity: [] for granularity in GRANULARITIES}
+        self._last_keys = None
+        self._next_boundary = None
+        self._event = None
+
+    def subscribe(self, callback, granularity='second'):
+        """
+        Подписывает callback(moment) на тики заданной частоты
+
+        Returns:
+            callable: Тот же callback (удобно для отписки)
+        """
+        self._subscribers[granularity].append(callback)
+        return callback
+
+    def unsubscribe(self, callback, granularity='second'):
+        """Отписывает callback, если он был подписан"""
+        if callback in self._subscribers[granularity]:
+            self._subscribers[granularity].remove(callback)
+
+    def subscriber_count(self):
+        """Общее число подписчиков всех частот"""
+        return sum(len(callbacks) for callbacks in self._subscribers.values())
+
+    def start(self):
+        """Запускает тики с ближайшей границы"""
+        if self._event is None:
+            self._arm()
+
+    def stop(self):
+        """Останавливает тики"""
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _arm(self):
+        """Планирует вызов на следующую границу полусекунды"""
+        now = self._clock()
+        self._next_boundary = (math.floor(now / TICK_INTERVAL) + 1) * TICK_INTERVAL
+        self._event = self._schedule_once(self._tick, self._next_boundary - now)
+
+    def _tick(self, *args):
+        now = self._clock()
+        boundary = self._next_boundary
+
+        # Планировщик сработал раньше границы: ждем ее еще раз
+        if now < boundary - EARLY_TOLERANCE:
+            self._event = self._schedule_once(self._tick, boundary - now)
+            return
+
+        # Проснулись с большим опозданием (сон устройства) - берем последнюю прошедшую границу
+        if now - boundary >= TICK_INTERVAL:
+            boundary = math.floor(now / TICK_INTERVAL) * TICK_INTERVAL
+
+        self.dispatch(self._to_local(boundary))
+        self._arm()
+
+    def dispatch(self, moment):
+        """
+        Вызывает подписчиков, чье значение могло измениться к моменту moment
+
+        Args:
+            moment (datetime): Момент тика (одинаковый для всех подписчиков)
+        """
+        keys = _period_keys(moment)
+        last_keys = self._last_keys
+        self._last_keys = keys
+        for granularity in GRANULARITIES:
+            if last_keys is not None and keys[granularity] == last_keys[granularity]:
+                continue
+            for callback in list(self._subscribers[granularity]):
+                callback(moment)
@@ -0,0 +1,155 @@
+"""
+Таблица переходов смещения от UTC для часового пояса.
+
+Правила zoneinfo разворачиваются один раз в два отсортированных массива:
+моменты переходов (секунды Unix) и смещения, действующие с каждого
+момента. После этого перевод любого числа моментов из UTC в местное
+время - это searchsorted по массиву переходов и одно сложение, а для
+одного момента - bisect по списку.
+
+Часы, даты и времена намаза берут местное время из одной таблицы,
+поэтому при переходе на летнее время они не расходятся.
+"""
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+
+# Момент "до всех переходов" - начало первого интервала таблицы
+BEFORE_ALL = -2 ** 62
+
+class OffsetTable:
+    """
+    Смещения от UTC по интервалам между переходами
+
+    Args:
+        transitions (sequence): Возрастающие моменты переходов (секунды Unix),
+                                первый - BEFORE_ALL
+        offsets (sequence): Смещение в секундах, действующее с каждого момента
+        name (str): Имя пояса (для сообщений)
+
+    Вне диапазона, по которому построена таблица, действует
+    ближайшее крайнее смещение.
+    """
+
+    def __init__(self, transitions, offsets, name=''):
+        self.transitions = np.asarray(transitions, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.name = name
+        # Списки для bisect при одиночном переводе
+        self._transitions = self.transitions.tolist()
+        self._offsets = self.offsets.tolist()
+        self._tzinfo = {}
+
+    @classmethod
+    def fixed(cls, hours):
+        """Таблица постоянного смещения (пояс без перехода на летнее время)"""
+        return cls([BEFORE_ALL], [int(round(hours * 3600))], f"UTC{hours:+g}")
+
+    def offsets_at(self, utc_seconds):
+        """Смещения в секундах для массива моментов UTC"""
+        index = np.searchsorted(self.transitions, utc_seconds, side='right') - 1
+        return self.offsets[index]
+
+    def to_local(self, utc_seconds):
+        """Местное время (секунды Unix "по стенным часам") для массива моментов UTC"""
+        utc_seconds = np.asarray(utc_seconds)
+        return utc_seconds + self.offsets_at(utc_seconds)
+
+    def to_utc(self, local_seconds):
+        """
+        Моменты UTC для массива местных времен
+
+        Несуществующее время (пропущенный час) сдвигается вперед,
+        неоднозначное (повторенный час) берется по второму из двух смещений.
+        """
+        local_seconds = np.asarray(local_seconds)
+        guess = local_seconds - self.offsets_at(local_seconds)
+        return local_seconds - self.offsets_at(guess)
+
+    def offset_at(self, utc_seconds):
+        """Смещение в секундах для одного момента UTC"""
+        return self._offsets[bisect_right(self._transitions, utc_seconds) - 1]
+
+    def datetime_at(self, utc_seconds):
+        """
+        Местные дата и время одного момента
+
+        Returns:
+            datetime: С фиксированным tzinfo текущего смещения, поэтому
+                      timestamp() возвращает исходный момент
+        """
+        offset = self.offset_at(utc_seconds)
+        tzinfo = self._tzinfo.get(offset)
+        if tzinfo is None:
+            tzinfo = self._tzinfo[offset] = timezone(timedelta(seconds=offset))
+        return datetime.fromtimestamp(utc_seconds, tzinfo)
+
+def _refine(zone, low, high, low_offset):
+    """Бинарный поиск секунды перехода между моментами low и high"""
+    while high - low > 1:
+        middle = (low + high) // 2
+        if datetime.fromtimestamp(middle, zone).utcoffset() == low_offset:
+            low = middle
+        else:
+            high = middle
+    return high
+
+@lru_cache(maxsize=32)
+def zone_offsets(name, first_year, last_year):
+    """
+    Таблица переходов пояса name на годы first_year..last_year
+
+    Переходы ищутся по суточным отсчетам zoneinfo и уточняются до
+    секунды бинарным поиском, поэтому таблица на десять лет строится
+    за несколько миллисекунд.
+
+    Returns:
+        OffsetTable: Таблица (ZoneInfoNotFoundError для неизвестного пояса)
+    """
+    zone = ZoneInfo(name)
+    start = int(datetime(first_year, 1, 1, tzinfo=timezone.utc).timestamp()) - SECONDS_PER_DAY
+    end = int(datetime(last_year + 1, 1, 1, tzinfo=timezone.utc).timestamp()) + SECONDS_PER_DAY
+
+    previous = datetime.fromtimestamp(start, zone).utcoffset()
+    transitions = [BEFORE_ALL]
+    offsets = [int(previous.total_seconds())]
+    for moment in range(start + SECONDS_PER_DAY, end + 1, SECONDS_PER_DAY):
+        offset = datetime.fromtimestamp(moment, zone).utcoffset()
+        if offset != previous:
+            transitions.append(_refine(zone, moment - SECONDS_PER_DAY, moment, previous))
+            offsets.append(int(offset.total_seconds()))
+            previous = offset
+    return OffsetTable(transitions, offsets, name)
+
+def current_offset(name):
+    """
+    Смещение пояса name от UTC сейчас, в часах
+
+    Записывается в настройку utc_offset - запасное смещение на случай,
+    если пояс на устройстве не найдется.
+
+    Returns:
+        float: Часы (ZoneInfoNotFoundError для неизвестного пояса)
+    """
+    return datetime.now(ZoneInfo(name)).utcoffset().total_seconds() / 3600.0
+
+def offset_table(settings, first_year, last_year):
+    """
+    Таблица смещений для настроек расчета
+
+    Args:
+        settings (dict): Настройки с ключами timezone (имя IANA или пусто)
+                         и utc_offset (часы, если пояс не задан или не найден)
+    """
+    name = settings.get('timezone')
+    if name:
+        try:
+            return zone_offsets(name, first_year, last_year)
+        except (ZoneInfoNotFoundError, ValueError):
+            # Нет базы поясов (tzdata) на устройстве или неверное имя
+            pass
+    return OffsetTable.fixed(settings['utc_offset'])
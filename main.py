@@ -1,8 +1,25 @@
+import os
+import sys
+import time
+
+# Режимы командной строки работают без окна приложения:
+#     python main.py export --format csv|ics|json ...
+#     python main.py location НАЗВАНИЕ | ШИРОТА ДОЛГОТА
+if __name__ == "__main__" and sys.argv[1:2] == ['export']:
+    from logic.export import main as export_main
+    sys.exit(export_main(sys.argv[2:]))
+if __name__ == "__main__" and sys.argv[1:2] == ['location']:
+    from data.gazetteer import main as gazetteer_main
+    sys.exit(gazetteer_main(['apply'] + sys.argv[2:]))
+
 import kivy
 from datetime import datetime
 import math
 kivy.require('2.2.1')
 
+# Момент запуска для замера времени старта
+STARTED_AT = time.perf_counter()
+
 # Импорты базовых классов Kivy
 from kivy.app import App
 from kivy.core.window import Window
@@ -10,6 +27,7 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.input.motionevent import MotionEvent
 from kivy.clock import Clock
+from kivy.logger import Logger
 from kivy.core.text import LabelBase
 from kivy.metrics import sp, dp
 from kivy.uix.anchorlayout import AnchorLayout
@@ -17,14 +35,26 @@ from kivy.uix.anchorlayout import AnchorLayout
 # Импорты локальных модулей приложения
 from ui.settings_window import SettingsWindow
 from ui.settings_manager import SettingsManager
-from ui.clock_widget import ClockWidget
+from ui.glyph_clock import GlyphClock
 from data.database import SettingsDatabase
-from logic.clock_functions import get_formatted_time
-from ui.main_portrait import create_portrait_widgets
+from logic.prayer_times import compute_prayer_times, calculation_key, year_days
+from logic.prayer_cache import PrayerTimesCache
+from logic.tick_service import TickService
+from logic.timezones import offset_table
+from logic.date_formatted import date_service
+from logic.crescent import sighting_calendar
+from logic.hijri import hijri_calendar
+from ui.lifecycle import active_handler_count
+from data.timetable import TimetableBundle, open_timetable
+from ui.main_portrait import create_portrait_widgets, resize_portrait_widgets
 from ui.main_landscape import create_landscape_prayer_times_table
 from ui.main_square import create_square_prayer_times_table
 from logic.display_utils import is_mobile_device
-from logic.fonts_registration import register_fonts
+from ui.fonts_registration import register_fonts
+from ui.alarms import AlarmPlayer
+
+# Файл заранее рассчитанных расписаний
+TIMETABLE_PATH = 'data/timetable.bin'
 
 class MainWindowApp(App):
     def __init__(self, **kwargs):
@@ -44,6 +74,23 @@ class MainWindowApp(App):
         # Регистрация шрифтов
         register_fonts()
         
+        # Таблица переходов пояса: часы, даты и времена намаза
+        # переводят моменты в местное время одинаково
+        year = datetime.now().year
+        self.zone = offset_table(self.settings_db.get_calculation_settings(), year - 1, year + 10)
+        date_service.set_today(lambda: self.local_now().date())
+        self._sighting_key = None
+        self._sighting_calendar = None
+        
+        # Единый источник тиков часов для всех виджетов
+        self.tick_service = TickService(Clock.schedule_once, to_local=self.zone.datetime_at)
+        
+        # Кэш времен намаза: память -> строка файла расписаний -> SQLite -> расчет
+        self.timetable = None
+        self.prayer_cache = PrayerTimesCache(
+            self.settings_db, self.compute_prayer_year, read_day=self.read_prayer_day
+        )
+        
         # Черный фон
         Window.clearcolor = (0, 0, 0, 1)
         
@@ -57,52 +104,47 @@ class MainWindowApp(App):
             padding=0
         )
         
-        # Создаем заголовок
-        self.title_label = Label(
-            text=self.get_current_time(), 
+        # Создаем заголовок: часы из заранее отрисованных глифов
+        self.title_label = GlyphClock(
             font_name="fonts/DSEG-Classic/DSEG7Classic-Bold.ttf",
             color=(0, 1, 0, 1),  # зеленый цвет как у часов
             size_hint_x=1,  # занимает всю ширину
             size_hint_y=None,  # отключаем автоматическую высоту
             height=str(Window.width * 0.3) + 'dp',  # высота зависит от ширины
             pos_hint={'top': 1},  # прижат к верху
-            font_size=str(Window.width // 3.5) + 'sp',  # начальный размер шрифта
-            halign='center'  # центрирование текста
+            font_size=str(Window.width // 3.5) + 'sp'  # начальный размер шрифта
         )
+        self.title_label.show_time(self.local_now())
         
-        # Привязываем обновление размера шрифта и высоты к изменению размера окна
-        Window.bind(width=self.update_title_font_size)
-        Window.bind(height=self.update_title_height)
+        # Серия событий изменения размера сводится к одной перестройке за кадр
+        # (вместе с размером шрифта и высотой заголовка)
+        self.trigger_relayout = Clock.create_trigger(self.relayout)
         Window.bind(on_resize=self.on_window_resize)
         
         # Добавляем заголовок в начало макета
         self.layout.add_widget(self.title_label)
 
         # Определение ориентации и создание соответствующей таблицы молитв
-        current_orientation = self.get_current_orientation()
+        self.current_orientation = None
+        self.main_window_body = None
+        self.relayout()
+
+        # Обновление времени и мигание точек на каждой границе полусекунды
+        self.tick_service.subscribe(self.update_time_with_colon, 'tick')
         
-        if current_orientation == 'portrait':
-            portrait_layout = GridLayout(
-                cols=1,
-                spacing=dp(0),
-                size_hint=(1, 1)
+        # Сервис дат оповещает метки дат только при смене даты
+        self.tick_service.subscribe(date_service.on_day, 'day')
+        if self.settings_db.get_setting('hijri_calendar') == 'sighting':
+            # Таблица на год вокруг сегодняшней даты; в полночь сервис дат
+            # запрашивает ее сам, пересчет - только при смене года хиджры
+            date_service.set_calendar(
+                self.sighting_calendar_for(self.local_now().date()), self.sighting_calendar_for
             )
-            
-            # Создаем и заполняем портретный layout
-            portrait_layout = self.create_portrait_widgets(portrait_layout)
-            main_window_body = portrait_layout
-        elif current_orientation == 'landscape':
-            main_window_body = create_landscape_prayer_times_table(self)
-        else:  # square
-            main_window_body = create_square_prayer_times_table(self)
+        self.tick_service.start()
         
-        # Добавление таблицы молитв, если она не None
-        if main_window_body:
-            self.layout.add_widget(main_window_body)
-
-        # Запускаем таймер обновления времени и мигания точек каждые 0.5 секунды
-        self.is_colon_visible = True
-        Clock.schedule_interval(self.update_time_with_colon, 0.5)
+        # Азан, напоминания и бой часов: один таймер на ближайшее событие
+        self.alarms = AlarmPlayer(self)
+        self.alarms.start()
 
         # Устанавливаем текущее окно
         self.current_window = 'main'
@@ -135,30 +177,74 @@ class MainWindowApp(App):
             self.settings_manager.open_settings_window()
         return False
 
-    def update_title_font_size(self, instance, width):
-        """
-        Обновляем размер шрифта в зависимости от ширины окна
-        """
-        self.title_label.font_size = str(width // 3.5) + 'sp'
-
-    def update_title_height(self, instance, height):
+    def update_title_size(self):
         """
-        Обновляем высоту заголовка в зависимости от ширины окна
+        Обновляем размер шрифта и высоту заголовка в зависимости от ширины окна
         """
+        self.title_label.font_size = str(Window.width // 3.5) + 'sp'
         self.title_label.height = str(Window.width * 0.3) + 'dp'
 
-    def get_current_time(self, show_colon=True):
+    def read_prayer_day(self, day, settings):
+        """
+        Времена дня из файла расписаний без расчета (None, если года в файле нет)
+        """
+        if self.timetable is None:
+            if not os.path.exists(TIMETABLE_PATH):
+                return None
+            try:
+                self.timetable = TimetableBundle(TIMETABLE_PATH)
+            except ValueError:
+                return None
+        return self.timetable.day_minutes(calculation_key(settings), day)
+
+    def compute_prayer_year(self, year, settings):
+        """
+        Возвращает времена намаза на весь год из файла расписания
+        (год рассчитывается движком, только если его нет в файле)
+        """
+        key = calculation_key(settings)
+        if self.timetable is None or (key, year) not in self.timetable:
+            if self.timetable is not None:
+                self.timetable.close()
+            self.timetable = open_timetable(
+                TIMETABLE_PATH, key, year,
+                lambda year: compute_prayer_times(year_days(year), **settings)
+            )
+        return self.timetable.minutes(key, year)[:len(year_days(year))]
+
+    def sighting_calendar_for(self, day):
+        """
+        Календарь хиджры по видимости серпа в месте расчета времен
+        намаза на год вокруг day (пересчитывается при смене места или
+        года хиджры)
+        """
+        settings = self.settings_db.get_calculation_settings()
+        key = (settings['latitude'], settings['longitude'], hijri_calendar.to_hijri(day)[0])
+        if key != self._sighting_key:
+            self._sighting_key = key
+            self._sighting_calendar = sighting_calendar(
+                settings['latitude'], settings['longitude'], around=day
+            )
+        return self._sighting_calendar
+
+    def local_now(self):
+        """Текущие местные дата и время по таблице пояса расчета"""
+        return self.zone.datetime_at(time.time())
+
+    def get_today_prayer_times(self):
         """
-        Получаем текущее время с возможностью скрыть двоеточие
+        Возвращает времена намаза на сегодня в минутах от полуночи
         """
-        return get_formatted_time(show_colon)
+        return self.prayer_cache.get(self.local_now().date())
     
-    def update_time_with_colon(self, dt):
+    def update_time_with_colon(self, now):
         """
         Обновляем время с мигающим двоеточием
+        
+        Двоеточие видно в первой половине секунды, поэтому все часы
+        мигают синхронно с настоящей секундой.
         """
-        self.is_colon_visible = not self.is_colon_visible
-        self.title_label.text = self.get_current_time(self.is_colon_visible)
+        self.title_label.show_time(now)
 
     def _on_clock_widget_created(self, clock_widget=None):
         """
@@ -220,16 +306,28 @@ class MainWindowApp(App):
 
     def on_window_resize(self, instance, width, height):
         """
-        Обработчик изменения размера окна
+        Обработчик изменения размера окна: перестройка откладывается
+        до следующего кадра, сколько бы событий ни пришло
         """
-        # Удаляем старую таблицу
-        for child in self.layout.children[:]:
-            if isinstance(child, GridLayout) and child != self.title_label:
-                self.layout.remove_widget(child)
-        
-        # Определяем новую ориентацию
+        self.trigger_relayout()
+
+    def relayout(self, *args):
+        """
+        Пересоздает тело окна только при смене ориентации,
+        иначе лишь обновляет размеры существующих виджетов
+        """
+        self.update_title_size()
         current_orientation = self.get_current_orientation()
         
+        if current_orientation == self.current_orientation:
+            if current_orientation == 'portrait':
+                resize_portrait_widgets(self, self.main_window_body)
+            return
+        
+        # Удаляем старую таблицу
+        if self.main_window_body is not None:
+            self.layout.remove_widget(self.main_window_body)
+        
         # Создаем новую таблицу
         if current_orientation == 'portrait':
             portrait_layout = GridLayout(
@@ -249,6 +347,16 @@ class MainWindowApp(App):
         # Добавляем таблицу, если она не None
         if main_window_body:
             self.layout.add_widget(main_window_body)
+        
+        self.current_orientation = current_orientation
+        self.main_window_body = main_window_body
+        
+        # Число живых обработчиков не должно расти от перестройки к перестройке
+        Logger.debug(
+            "Azan: перестройка макета, привязок %d, подписчиков тиков %d",
+            active_handler_count(),
+            self.tick_service.subscriber_count()
+        )
 
     def classify_block_orientation(self, block):
         """
@@ -301,10 +409,20 @@ class MainWindowApp(App):
         # Используем функцию из main_portrait с новой сигнатурой
         return create_portrait_widgets_func(self, layout)
 
+    def on_start(self):
+        """
+        Вызывается после построения интерфейса: записываем время старта
+        """
+        Logger.info("Azan: старт за %.1f мс", (time.perf_counter() - STARTED_AT) * 1e3)
+
     def on_stop(self):
         """
         Вызывается при закрытии приложения
         """
+        self.tick_service.stop()
+        self.alarms.stop()
+        if self.timetable is not None:
+            self.timetable.close()
         self.settings_db.save_window_settings(
             width=Window.width,
             height=Window.height,
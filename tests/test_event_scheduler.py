@@ -0,0 +1,113 @@
+"""
+Проверка планировщика звуковых событий на поддельных часах.
+
+_Clock подменяет Clock.schedule_once и оба вида часов: таймеры только
+записываются, время двигает сам тест, а сработавший таймер вызывается
+явно.
+"""
+from datetime import date, datetime, timezone
+from logic.event_scheduler import MAX_SLEEP, STALE_AFTER, EventScheduler, plan_day
+from logic.timezones import OffsetTable
+
+# Стенные часы в начале теста: 2025-06-21 12:00 UTC
+START = datetime(2025, 6, 21, 12, 0, tzinfo=timezone.utc).timestamp()
+
+class _Timer:
+    def __init__(self, callback, delay):
+        self.callback = callback
+        self.delay = delay
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class _Clock:
+    def __init__(self):
+        self.wall = START
+        self.mono = 1000.0
+        self.timers = []
+
+    def schedule_once(self, callback, delay):
+        timer = _Timer(callback, delay)
+        self.timers.append(timer)
+        return timer
+
+    def armed(self):
+        return [timer for timer in self.timers if not timer.cancelled]
+
+    def advance(self, seconds, wall_jump=0.0):
+        """Сдвигает оба вида часов и вызывает взведенный таймер"""
+        self.mono += seconds
+        self.wall += seconds + wall_jump
+        (timer,) = self.armed()
+        timer.cancelled = True
+        timer.callback(timer.delay)
+
+def _scheduler():
+    clock = _Clock()
+    return clock, EventScheduler(clock.schedule_once, lambda: clock.wall, lambda: clock.mono)
+
+def test_single_armed_timer():
+    clock, scheduler = _scheduler()
+    fired = []
+    for minutes in (30, 10, 20, 5, 40):
+        scheduler.add(START + minutes * 60, fired.append, 'adhan', str(minutes))
+        # Сколько бы событий ни было, взведен один таймер - на самое раннее
+        assert len(clock.armed()) == 1
+    assert clock.armed()[0].delay == MAX_SLEEP
+    assert [event.name for event in scheduler.pending()] == ['5', '10', '20', '30', '40']
+
+    # Событие позже первого таймер не перевзводит
+    timers = len(clock.timers)
+    scheduler.add(START + 50 * 60, fired.append)
+    assert len(clock.timers) == timers
+
+    while clock.armed():
+        clock.advance(clock.armed()[0].delay)
+    assert [event.name for event in fired] == ['5', '10', '20', '30', '40', '']
+    assert scheduler.lateness_stats() == (6, 0.0, 0.0, 0)
+
+def test_wall_clock_jump_reanchors_deadlines():
+    clock, scheduler = _scheduler()
+    fired = []
+    event = scheduler.add(START + 600, fired.append)
+    deadline = event.deadline
+
+    # Часы перевели на 5 минут вперед: азан наступает раньше по монотонным часам
+    clock.advance(MAX_SLEEP, wall_jump=300.0)
+    assert event.deadline == deadline - 300.0
+    assert not fired
+    while clock.armed():
+        clock.advance(clock.armed()[0].delay)
+    assert fired == [event]
+    assert clock.wall == START + 600
+
+def test_events_after_long_sleep_are_missed():
+    clock, scheduler = _scheduler()
+    fired = []
+    missed = scheduler.add(START + 60, fired.append, 'adhan', 'asr')
+    played = scheduler.add(START + STALE_AFTER + 120, fired.append, 'adhan', 'maghrib')
+
+    # Устройство спало: монотонные часы стояли, стенные ушли на 2*STALE_AFTER
+    clock.advance(0.0, wall_jump=2 * STALE_AFTER)
+    assert fired == [played]
+    assert [(event, sounded) for event, _, sounded in scheduler.lateness] == [(missed, False), (played, True)]
+    count, _, _, missed_count = scheduler.lateness_stats()
+    assert (count, missed_count) == (1, 1)
+    assert not clock.armed()
+
+def test_plan_day_isha_after_midnight():
+    zone = OffsetTable.fixed(2)
+    day = date(2025, 6, 21)
+    # Лето на 58° с.ш.: иша в 00:40 уже следующей даты
+    times = [float(minutes) for minutes in (90, 150, 270, 800, 1030, 1330, 40)]
+    events = plan_day(day, times, zone, reminder_minutes=10)
+
+    midnight = datetime(2025, 6, 21, tzinfo=timezone.utc).timestamp() - 2 * 3600
+    moments = {(kind, name): moment for moment, kind, name in events}
+    assert moments[('adhan', 'isha')] == midnight + (1440 + 40) * 60
+    assert moments[('reminder', 'isha')] == midnight + (1440 + 30) * 60
+    assert moments[('adhan', 'maghrib')] == midnight + 1330 * 60
+    # Иша - последнее событие дня, а не первое
+    assert events[-1] == (moments[('adhan', 'isha')], 'adhan', 'isha')
+    assert [moment for moment, _, _ in events] == sorted(moment for moment, _, _ in events)
@@ -0,0 +1,121 @@
+"""
+Проверка индекса поясов на синтетическом наборе из 741 полигона.
+
+Сетка 36x18 квадратов по 10° покрывает весь мир. Каждый квадрат - свой
+пояс Z/i_j, его стороны зашумлены независимо от соседей, поэтому после
+упрощения вдоль общих границ остаются щели и наложения, как у настоящих
+полигонов timezone-boundary-builder. В каждом седьмом квадрате есть
+дыра 4..6° с островом H/i_j (MultiPolygon) 4.5..5.5° внутри.
+"""
+import json
+import numpy as np
+import pytest
+from data.timezone_index import (
+    SNAP_DISTANCE, TIMEZONE_INDEX_PATH, TimezoneIndex, build_timezone_index, fallback_timezone,
+    read_geojson, timezone_at
+)
+
+# Точек на сторону квадрата и шум вершин, градусы
+EDGE_POINTS = 60
+NOISE = 0.004
+
+def _has_hole(i, j):
+    return (i + j) % 7 == 0
+
+def _square(x0, y0, size, points=5):
+    t = np.linspace(0.0, 1.0, points, endpoint=False)
+    return np.vstack([
+        np.c_[x0 + size * t, np.full_like(t, y0)],
+        np.c_[np.full_like(t, x0 + size), y0 + size * t],
+        np.c_[x0 + size - size * t, np.full_like(t, y0 + size)],
+        np.c_[np.full_like(t, x0), y0 + size - size * t],
+    ])
+
+def _features(rng):
+    features = []
+    for i in range(36):
+        for j in range(18):
+            x0, y0 = -180 + 10 * i, -90 + 10 * j
+            ring = _square(x0, y0, 10, EDGE_POINTS) + rng.normal(0.0, NOISE, (4 * EDGE_POINTS, 2))
+            coordinates = [np.vstack([ring, ring[:1]]).tolist()]
+            if _has_hole(i, j):
+                hole = _square(x0 + 4, y0 + 4, 2)
+                coordinates.append(np.vstack([hole, hole[:1]]).tolist())
+            features.append({
+                'type': 'Feature',
+                'properties': {'tzid': f'Z/{i}_{j}'},
+                'geometry': {'type': 'Polygon', 'coordinates': coordinates}
+            })
+            if _has_hole(i, j):
+                island = _square(x0 + 4.5, y0 + 4.5, 1)
+                features.append({
+                    'type': 'Feature',
+                    'properties': {'tzid': f'H/{i}_{j}'},
+                    'geometry': {'type': 'MultiPolygon', 'coordinates': [[np.vstack([island, island[:1]]).tolist()]]}
+                })
+    return features
+
+@pytest.fixture(scope='module')
+def index(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('timezones')
+    source = directory / 'zones.json'
+    source.write_text(json.dumps({'type': 'FeatureCollection', 'features': _features(np.random.default_rng(1))}))
+    path = str(directory / 'timezones.bin')
+    assert build_timezone_index(read_geojson(source), path) == 741
+    index = TimezoneIndex(path)
+    yield index
+    index.close()
+
+def _expected(latitude, longitude):
+    """Пояс точки и ее расстояние до ближайшей границы в синтетическом наборе"""
+    i, j = int((longitude + 180) // 10), int((latitude + 90) // 10)
+    x, y = longitude + 180 - 10 * i, latitude + 90 - 10 * j
+    zone = f'Z/{i}_{j}'
+    border = min(x, 10 - x, y, 10 - y)
+    if _has_hole(i, j):
+        inner = min(abs(x - 4), abs(x - 6), abs(y - 4), abs(y - 6), abs(x - 4.5), abs(x - 5.5),
+                    abs(y - 4.5), abs(y - 5.5))
+        border = min(border, inner)
+        if 4 < x < 6 and 4 < y < 6:
+            zone = f'H/{i}_{j}' if (4.5 < x < 5.5 and 4.5 < y < 5.5) else None
+    return zone, border
+
+def test_interior_points(index):
+    rng = np.random.default_rng(2)
+    checked = 0
+    for latitude, longitude in zip(rng.uniform(-89.9, 89.9, 2000), rng.uniform(-179.9, 179.9, 2000)):
+        zone, border = _expected(latitude, longitude)
+        if border < 3 * NOISE + SNAP_DISTANCE:
+            continue
+        assert index.lookup(latitude, longitude) == zone, (latitude, longitude)
+        # R-дерево проверяет один-два полигона, а не все
+        assert index.last_candidates <= 3
+        checked += 1
+    assert checked > 1500
+
+def test_shared_borders_have_no_gaps(index):
+    rng = np.random.default_rng(3)
+    for _ in range(500):
+        # Точка на общей стороне двух квадратов
+        i, j = int(rng.integers(1, 36)), int(rng.integers(0, 18))
+        latitude = -90 + 10 * j + rng.uniform(0.5, 9.5)
+        longitude = -180 + 10 * i + rng.normal(0.0, NOISE)
+        assert index.lookup(latitude, longitude) in (f'Z/{i - 1}_{j}', f'Z/{i}_{j}'), (latitude, longitude)
+
+def test_no_snap_far_from_polygons(index):
+    # Середина дыры между ее краем и островом (дальше SNAP_DISTANCE от обоих)
+    assert index.lookup(-90 + 4.25, -180 + 4.25) is None
+    assert index.lookup(-90 + 4.25, -180 + 4.25, snap=0.3) == 'Z/0_0'
+
+def test_fallbacks():
+    assert timezone_at(40.4, 49.8, path='missing.bin') == 'Etc/GMT-3'
+    assert fallback_timezone(-75) == 'Etc/GMT+5'
+    assert fallback_timezone(3) == 'Etc/GMT'
+
+def test_shipped_index():
+    # Файл из репозитория: у точки в Италии ближайший город справочника - Вена
+    assert timezone_at(45.0, 10.0, path=TIMEZONE_INDEX_PATH) == 'Europe/Rome'
+    assert timezone_at(40.41, 49.87) == 'Asia/Baku'
+    # Asia/Urumqi наложен на Asia/Shanghai и меньше его
+    assert timezone_at(41.08, 80.14) == 'Asia/Urumqi'
+    assert timezone_at(39.9, 116.4) == 'Asia/Shanghai'
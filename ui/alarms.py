@@ -0,0 +1,106 @@
+"""
+Звуки азана, напоминаний и боя часов.
+
+События дня берутся из logic.event_scheduler.plan_day по временам из
+кэша намаза и кладутся в один EventScheduler на Clock.schedule_once.
+При запуске планируются сегодня и завтра, затем в каждую полночь -
+следующий день, поэтому в куче всегда не больше двух суток событий.
+Запланированные дни запоминаются: первый тик после запуска тоже
+приходит как смена даты, и завтрашний день не добавляется дважды.
+"""
+import logging
+from datetime import timedelta
+from kivy.clock import Clock
+from kivy.core.audio import SoundLoader
+from logic.event_scheduler import EventScheduler, plan_day
+
+logger = logging.getLogger(__name__)
+
+# Азан утренней молитвы (İmsak) отдельной записью
+FAJR_ADHAN_SOUND = 'audio/adhan/AdhanMisharyRashidAlafasyFajr.mp3'
+
+# Напоминание перед намазом и бой часов
+REMINDER_SOUND = 'audio/alarm/zil.mp3'
+CHIME_SOUND = 'audio/alarm/saatAlarm.mp3'
+
+class AlarmPlayer:
+    """
+    Планирует и проигрывает звуковые события приложения
+
+    Настройки (таблица settings): adhan_sound (файл азана, пусто - без азана),
+    reminder_minutes (0 - без напоминаний), hourly_chime ('1' - бить часы).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.scheduler = EventScheduler(Clock.schedule_once)
+        self._sounds = {}
+        # Дни, события которых уже в планировщике
+        self._planned = set()
+
+    def start(self):
+        """Планирует сегодня и завтра и подписывается на смену даты"""
+        today = self.app.local_now().date()
+        self.plan(today)
+        self.plan(today + timedelta(days=1))
+        self.app.tick_service.subscribe(self.on_day, 'day')
+
+    def stop(self):
+        """Снимает таймер, подписку и останавливает звуки"""
+        self.app.tick_service.unsubscribe(self.on_day, 'day')
+        self.scheduler.clear()
+        self._planned.clear()
+        for sound in self._sounds.values():
+            sound.stop()
+        count, mean, worst, missed = self.scheduler.lateness_stats()
+        logger.info(
+            "Звуковых событий: %d, опоздание среднее %.3f с, наибольшее %.3f с, пропущено %d",
+            count, mean, worst, missed
+        )
+
+    def on_day(self, moment):
+        """В полночь добавляет события следующего дня"""
+        today = moment.date()
+        self._planned = {day for day in self._planned if day >= today}
+        self.plan(today + timedelta(days=1))
+
+    def plan(self, day):
+        """Добавляет в планировщик события дня day (один раз)"""
+        if day in self._planned:
+            return
+        self._planned.add(day)
+        db = self.app.settings_db
+        chime = db.get_setting('hourly_chime') == '1'
+        reminder_minutes = int(db.get_setting('reminder_minutes') or 0)
+        adhan = bool(db.get_setting('adhan_sound'))
+        times = self.app.prayer_cache.get(day)
+        for wall_time, kind, name in plan_day(day, times, self.app.zone, reminder_minutes, chime):
+            if kind == 'adhan' and not adhan:
+                continue
+            self.scheduler.add(wall_time, self.play, kind, name)
+
+    def sound_path(self, event):
+        """Файл звука для события"""
+        if event.kind == 'chime':
+            return CHIME_SOUND
+        if event.kind == 'reminder':
+            return REMINDER_SOUND
+        if event.name == 'imsak':
+            return FAJR_ADHAN_SOUND
+        return self.app.settings_db.get_setting('adhan_sound')
+
+    def play(self, event):
+        """Проигрывает звук события (загруженные звуки переиспользуются)"""
+        path = self.sound_path(event)
+        sound = self._sounds.get(path)
+        if sound is None:
+            sound = SoundLoader.load(path)
+            if sound is None:
+                logger.warning("Не удалось загрузить звук %s", path)
+                return
+            self._sounds[path] = sound
+        sound.stop()
+        sound.play()
+        logger.debug(
+            "%s %s: опоздание %.3f с", event.kind, event.name, self.scheduler.lateness[-1][1]
+        )
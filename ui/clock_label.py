@@ -0,0 +1,151 @@
+"""
+Метка часов Kivy и подбор размера ее шрифта.
+
+Ширины глифов измеряются CoreLabel один раз на шрифт, затем размер
+предсказывается logic.clock_functions.predict_font_size и проверяется
+парой растеризаций.
+"""
+from kivy.uix.label import Label
+from kivy.core.text import Label as CoreLabel
+from kivy.core.window import Window
+from logic.clock_functions import (
+    CLOCK_GLYPHS, FIT_TOLERANCE, MAX_FIT_RENDERS, METRICS_FONT_SIZE,
+    get_formatted_time, next_fit_candidate, predict_font_size
+)
+from ui.lifecycle import Lifecycle
+
+# Кэш ширин глифов: {font_name: {глиф: ширина при METRICS_FONT_SIZE}}
+_glyph_advances = {}
+
+def get_glyph_advances(font_name):
+    """Ширины глифов часов для шрифта (измеряются один раз на шрифт)"""
+    advances = _glyph_advances.get(font_name)
+    if advances is None:
+        label = CoreLabel(font_name=font_name, font_size=METRICS_FONT_SIZE)
+        advances = {glyph: label.get_extents(glyph)[0] for glyph in CLOCK_GLYPHS}
+        _glyph_advances[font_name] = advances
+    return advances
+
+def measure_text_width(label):
+    """
+    Ширина текста label без отступов
+
+    Растеризует текст без text_size: с заданным text_size ширина
+    текстуры равна ширине области, а не текста.
+    """
+    text_size = label.text_size
+    label.text_size = (None, None)
+    try:
+        label.texture_update()
+        return label.texture_size[0] - label.padding[0] - label.padding[2]
+    finally:
+        label.text_size = text_size
+
+def fit_font_size(label, width):
+    """
+    Подбирает размер шрифта, при котором текст label занимает ширину width
+    
+    Размер сначала предсказывается по ширинам глифов, затем проверяется
+    не более чем MAX_FIT_RENDERS растеризациями: поправка по измеренной
+    ширине, а если она выходит из найденной вилки - деление вилки пополам.
+    
+    Returns:
+        float: Наибольший проверенный размер, при котором текст не шире width
+    """
+    font_size = predict_font_size(label.text, get_glyph_advances(label.font_name), width)
+    low, high = None, None
+    
+    for _ in range(MAX_FIT_RENDERS):
+        label.font_size = font_size
+        measured = measure_text_width(label)
+        
+        if measured <= width:
+            low = font_size
+            if measured >= width * (1 - FIT_TOLERANCE):
+                break
+        else:
+            high = font_size
+        
+        # Линейная поправка, пока она внутри вилки, иначе деление пополам
+        font_size = next_fit_candidate(font_size, measured, width, low, high)
+    
+    if low is None:
+        # Все проверки оказались шире окна - берем последнюю поправку
+        low = font_size
+    label.font_size = low
+    return low
+
+class BaseClockLabel(Label):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.font_name = "fonts/DSEG-Classic/DSEG7Classic-Bold.ttf"
+        self.color = (0, 1, 0, 1)
+        self.is_colon_visible = True
+        
+        # Базовые настройки
+        self.size_hint = (1, None)
+        self.halign = 'center'
+        
+        # Инициализация
+        self.setup_style()
+        
+        # Привязка к окну снимается, когда Label удаляется из дерева
+        self.lifecycle = Lifecycle(self)
+        self.lifecycle.bind(Window, 'on_resize', self.on_window_resize)
+
+    def calculate_font_size(self):
+        """Умная адаптация размера шрифта"""
+        width = Window.width
+        height = Window.height
+        aspect_ratio = width / height
+        
+        if aspect_ratio > 1:  # Альбомная ориентация
+            self.text_size = (width, None)
+            self.size = (width, height)
+            
+            # Предсказание по ширинам глифов и пара проверочных растеризаций
+            return fit_font_size(self, width)
+            
+        else:  # Портретная ориентация - не трогаем
+            font_size = min(width / 3.5, height / 3.5)
+            self.font_size = font_size
+            return font_size
+                
+    def setup_style(self):
+        """Базовая настройка стиля"""
+        self.size_hint = (1, 1)
+        self.text_size = (Window.width, Window.height)
+        self.padding = [0, 0, 0, 0]
+        self.spacing = 0
+        self.halign = 'center'
+        self.valign = 'top'  # Прижимаем к верху
+        
+        # Сначала устанавливаем текст
+        self.text = get_formatted_time(self.is_colon_visible)
+        self.texture_update()
+        
+        # Потом считаем размер шрифта
+        self.font_size = self.calculate_font_size()
+        
+        # Убираем все возможные отступы
+        self.bind(size=self._update_text_size)
+        self.bind(pos=self._update_text_size)
+    
+    def _update_text_size(self, *args):
+        """Обновляем размер текста при изменении размера или позиции"""
+        self.text_size = (Window.width, Window.height)
+        self.texture_update()
+    
+    def toggle_colon_visibility(self):
+        """Переключение видимости двоеточия"""
+        self.is_colon_visible = not self.is_colon_visible
+        self.text = get_formatted_time(self.is_colon_visible)
+
+    def show_time(self, now):
+        """Показывает время тика: двоеточие видно в первой половине секунды"""
+        self.is_colon_visible = now.microsecond < 500000
+        self.text = get_formatted_time(self.is_colon_visible, now)
+        
+    def on_window_resize(self, instance, width, height):
+        """Обработка изменения размера окна"""
+        self.calculate_font_size()
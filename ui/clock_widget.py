@@ -1,7 +1,8 @@
+from kivy.app import App
 from kivy.uix.gridlayout import GridLayout
-from kivy.clock import Clock
 from kivy.properties import BooleanProperty
-from logic.clock_functions import BaseClockLabel
+from ui.clock_label import BaseClockLabel
+from ui.lifecycle import Lifecycle
 
 class ClockWidget(GridLayout):
     colors = {
@@ -16,7 +17,7 @@ class ClockWidget(GridLayout):
         'white': (1, 1, 1, 1)
     }
 
-    def __init__(self, **kwargs):
+    def __init__(self, tick_service=None, **kwargs):
         super().__init__(**kwargs)
         self.cols = 1
         
@@ -24,12 +25,14 @@ class ClockWidget(GridLayout):
         self.clock_widget = BaseClockLabel()
         self.add_widget(self.clock_widget)
         
-        # Запускаем обновление времени
-        Clock.schedule_interval(self.update_time, 0.5)
+        # Подписываемся на общие тики приложения (до удаления виджета из окна)
+        self.lifecycle = Lifecycle(self)
+        self.tick_service = tick_service or App.get_running_app().tick_service
+        self.lifecycle.subscribe(self.tick_service, self.update_time, 'tick')
 
-    def update_time(self, dt):
+    def update_time(self, now):
         """Обновляем время и мигание двоеточия"""
-        self.clock_widget.toggle_colon_visibility()
+        self.clock_widget.show_time(now)
 
     def update_color(self, color_name):
         """Обновляем цвет часов"""
@@ -0,0 +1,94 @@
+"""
+Метки дат Kivy поверх logic.date_formatted.date_service.
+
+Части дат и разметка берутся из кэша сервиса дат; метки только
+показывают их и обновляются при смене ширины окна или даты.
+"""
+from kivy.uix.label import Label
+from kivy.core.window import Window
+from logic.date_formatted import (
+    build_gregorian_markup, build_hijri_markup, date_service, hijri_markup_size
+)
+
+def create_gregorian_date_label(base_font_size):
+    """
+    Создает Label для григорианской даты с разными шрифтами и размерами в одной строке
+    
+    Args:
+        base_font_size (float): Базовый размер шрифта
+    
+    Returns:
+        Label: Label с датой в одной строке
+    """
+    # Готовая разметка из кэша сервиса дат
+    marked_text = date_service.markup(build_gregorian_markup, base_font_size)
+    
+    # Создаем Label с поддержкой разметки
+    date_label = Label(
+        text=marked_text,
+        markup=True,  # Включаем поддержку разметки
+        color=(1, 1, 1, 1),
+        size_hint_x=1,
+        size_hint_y=None,
+        height=base_font_size * 0.3,  # Увеличиваем высоту для разных размеров
+        halign='center',
+        valign='middle'
+    )
+    
+    return date_label
+
+def create_hijri_date_label(base_font_size, lifecycle):
+    """
+    Создает Label с датами хиджры и григорианской в одной строке
+    
+    Args:
+        base_font_size (float): Базовый размер шрифта
+        lifecycle (Lifecycle): Владелец привязок к ширине окна и к смене даты
+    
+    Returns:
+        Label: Label с обеими датами в одной строке
+    """
+    # Рассчитываем базовый размер на основе ширины окна
+    window_width = Window.width
+    
+    # Формируем текст с разметкой для обеих дат (из кэша сервиса дат)
+    marked_text = date_service.markup(build_hijri_markup, hijri_markup_size(window_width))
+    
+    # Создаем Label с поддержкой разметки
+    date_label = Label(
+        text=marked_text,
+        markup=True,
+        color=(1, 1, 1, 1),
+        size_hint_x=1,
+        size_hint_y=None,
+        height=window_width * 0.06,  # Высота тоже адаптивная
+        halign='center',
+        valign='middle',
+        text_size=(Window.width, window_width * 0.06)  # Задаем полный размер текста
+    )
+    
+    # Привязываем обновление размеров к изменению размера окна
+    # (привязки снимаются вместе с макетом, которому принадлежит Label)
+    lifecycle.bind(Window, 'width', lambda *args: update_label_size(date_label))
+    
+    # Новая дата приходит только в полночь
+    lifecycle.subscribe(date_service, lambda formatted_dates: update_label_size(date_label), 'day')
+    
+    return date_label
+
+def update_label_size(label, *args):
+    """
+    Обновляет размеры и текст метки при изменении размера окна или даты
+    """
+    window_width = Window.width
+    
+    # Обновляем высоту метки
+    label.height = window_width * 0.06
+    label.text_size = (window_width, window_width * 0.06)
+    
+    # Разметка для этого размера строится один раз за день
+    marked_text = date_service.markup(build_hijri_markup, hijri_markup_size(window_width))
+    
+    # Обновляем текст метки, только если он изменился
+    if label.text != marked_text:
+        label.text = marked_text
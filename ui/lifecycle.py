@@ -0,0 +1,94 @@
+"""
+Владелец привязок группы виджетов.
+
+Все Window.bind и подписки на TickService, сделанные при создании
+виджетов, регистрируются в Lifecycle виджета. Lifecycle следит за
+всей цепочкой родителей: когда виджет или любой его предок удаляется
+из дерева окна, привязки снимаются разом, поэтому пересоздание макета
+не оставляет за собой замыканий, держащих старые Label (в том числе
+вложенные, вроде BaseClockLabel внутри ClockWidget).
+
+active_handler_count() возвращает число живых обработчиков во всех
+Lifecycle - по нему видно, что оно не растет со временем.
+"""
+from kivy.core.window import WindowBase
+
+# Число зарегистрированных и еще не снятых обработчиков
+_active_count = 0
+
+def active_handler_count():
+    """Общее число живых обработчиков во всех Lifecycle"""
+    return _active_count
+
+class Lifecycle:
+    """
+    Привязки, снимаемые при отсоединении виджета от окна
+
+    Args:
+        widget: Виджет группы (None - снимать только вручную через release)
+    """
+
+    def __init__(self, widget=None):
+        self._bindings = []
+        self._subscriptions = []
+        self._widget = widget
+        # Пары (предок, uid привязки к его parent)
+        self._ancestors = []
+        self._attached = False
+        if widget is not None:
+            self._attached = self._watch_ancestors()
+
+    def _watch_ancestors(self):
+        """
+        Следит за parent виджета и всех его предков
+
+        Returns:
+            bool: Достигает ли цепочка родителей окна
+        """
+        chain = [self._widget]
+        while chain[-1].parent is not None and not isinstance(chain[-1].parent, WindowBase):
+            chain.append(chain[-1].parent)
+        watched = dict(self._ancestors)
+        for node, uid in self._ancestors:
+            if node not in chain:
+                node.unbind_uid('parent', uid)
+        self._ancestors = [
+            (node, watched[node] if node in watched else node.fbind('parent', self._on_parent))
+            for node in chain
+        ]
+        return chain[-1].parent is not None
+
+    def _on_parent(self, *args):
+        attached = self._watch_ancestors()
+        if attached:
+            self._attached = True
+        elif self._attached:
+            self._attached = False
+            self.release()
+
+    def bind(self, dispatcher, name, callback):
+        """Привязывает callback к свойству или событию name у dispatcher"""
+        global _active_count
+        uid = dispatcher.fbind(name, callback)
+        self._bindings.append((dispatcher, name, uid))
+        _active_count += 1
+        return uid
+
+    def subscribe(self, tick_service, callback, granularity):
+        """Подписывает callback на тики TickService"""
+        global _active_count
+        tick_service.subscribe(callback, granularity)
+        self._subscriptions.append((tick_service, callback, granularity))
+        _active_count += 1
+        return callback
+
+    def release(self):
+        """Снимает все привязки и подписки"""
+        global _active_count
+        for dispatcher, name, uid in self._bindings:
+            dispatcher.unbind_uid(name, uid)
+        for tick_service, callback, granularity in self._subscriptions:
+            tick_service.unsubscribe(callback, granularity)
+        _active_count -= len(self._bindings) + len(self._subscriptions)
+        self._bindings = []
+        self._subscriptions = []
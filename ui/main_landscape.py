@@ -1,9 +1,20 @@
 """
 Модуль обработки ландшафтной ориентации.
 """
+from kivy.uix.boxlayout import BoxLayout
+from ui.lifecycle import Lifecycle
+from ui.sun_graph import SunGraph
 
 def create_landscape_prayer_times_table(self):
     """
-    Создает пустой layout для ландшафтной ориентации
+    Создает layout для ландшафтной ориентации: график высоты солнца
     """
-    return None
+    landscape_layout = BoxLayout(padding=self.calculate_font_size(scale_factor=0.15) * 0.3)
+
+    # Все привязки и подписки макета снимаются, когда он удаляется из окна
+    lifecycle = Lifecycle(landscape_layout)
+    landscape_layout.lifecycle = lifecycle
+
+    landscape_layout.sun_graph = SunGraph(self, lifecycle)
+    landscape_layout.add_widget(landscape_layout.sun_graph)
+    return landscape_layout
@@ -2,8 +2,13 @@ from kivy.uix.label import Label
 from kivy.uix.gridlayout import GridLayout
 from kivy.core.window import Window
 import locale
-from ui.main_portrait_prayer_times import create_prayer_times_layout, create_next_time_layout
-from logic.date_formatted import create_gregorian_date_label, create_hijri_date_label, get_formatted_dates
+from ui.main_portrait_prayer_times import (
+    create_prayer_times_layout, create_next_time_layout, NextPrayerCountdown,
+    resize_prayer_times_layout, resize_next_time_layout
+)
+from ui.lifecycle import Lifecycle
+from ui.date_labels import create_gregorian_date_label, create_hijri_date_label
+from ui.sun_graph import SunGraph
 
 def create_line_label(base_font_size):
     return Label(
@@ -36,21 +41,61 @@ def create_portrait_widgets(self, portrait_layout):
     # Расчет базового размера шрифта
     base_font_size = self.calculate_font_size(scale_factor=0.15)
 
+    # Все привязки и подписки макета снимаются, когда он удаляется из окна
+    lifecycle = Lifecycle(portrait_layout)
+    portrait_layout.lifecycle = lifecycle
+
     # Создаем Label для даты Хиджры (включает обе даты)
-    date_hijri_label = create_hijri_date_label(base_font_size)
+    date_hijri_label = create_hijri_date_label(base_font_size, lifecycle)
     
     # Создаем GridLayout для NextTimeName и NextTimeNumbers
     nex_time_layout = create_next_time_layout(self, base_font_size)
 
     # Добавляем виджеты в layout в нужном порядке
-    portrait_layout.add_widget(create_space_label(base_font_size))
+    space_label = create_space_label(base_font_size)
+    line_labels = [create_line_label(base_font_size), create_line_label(base_font_size)]
+    portrait_layout.add_widget(space_label)
     portrait_layout.add_widget(date_hijri_label)
-    portrait_layout.add_widget(create_line_label(base_font_size))  # line_label2
+    portrait_layout.add_widget(line_labels[0])  # line_label2
     portrait_layout.add_widget(nex_time_layout)
-    portrait_layout.add_widget(create_line_label(base_font_size))  # line_label2
+    portrait_layout.add_widget(line_labels[1])  # line_label2
     
     # Добавляем layout с временами молитв
     prayer_times_layout = create_prayer_times_layout(self, base_font_size)
     portrait_layout.add_widget(prayer_times_layout)
     
+    # График высоты солнца за сегодня под таблицей времен
+    sun_graph = SunGraph(self, lifecycle, size_hint_y=None, height=base_font_size * 2.5)
+    portrait_layout.add_widget(sun_graph)
+    
+    # Ссылки на виджеты для обновления размеров без пересоздания
+    portrait_layout.space_label = space_label
+    portrait_layout.line_labels = line_labels
+    portrait_layout.nex_time_layout = nex_time_layout
+    portrait_layout.prayer_times_layout = prayer_times_layout
+    portrait_layout.sun_graph = sun_graph
+    
+    # Запускаем обратный отсчет (останавливается вместе с макетом)
+    self.next_prayer_countdown = NextPrayerCountdown(
+        self, nex_time_layout.numbers_label, prayer_times_layout, lifecycle
+    )
+    
     return portrait_layout
+
+
+def resize_portrait_widgets(self, portrait_layout):
+    """
+    Обновляет размеры уже созданных виджетов портретного layout
+    
+    Args:
+        portrait_layout (GridLayout): Layout, созданный create_portrait_widgets
+    """
+    base_font_size = self.calculate_font_size(scale_factor=0.15)
+    
+    portrait_layout.space_label.height = base_font_size * 0.02
+    for line_label in portrait_layout.line_labels:
+        line_label.height = base_font_size * 0.1
+    
+    resize_next_time_layout(portrait_layout.nex_time_layout, base_font_size)
+    resize_prayer_times_layout(portrait_layout.prayer_times_layout, base_font_size)
+    portrait_layout.sun_graph.height = base_font_size * 2.5
@@ -1,5 +1,22 @@
 from kivy.uix.label import Label
 from kivy.uix.gridlayout import GridLayout
+from datetime import timedelta
+from logic.prayer_times import PRAYER_KEYS, format_minutes
+from logic.next_prayer import PrayerSchedule, format_countdown
+
+# Цвет обычной строки таблицы
+DEFAULT_ROW_COLOR = (1, 1, 1, 1)
+
+# Подписи времен по ключам оси времен logic.prayer_times.PRAYER_KEYS
+PRAYER_NAMES = {
+    'tahajjud': 'Təhəccüd ---',   # Полуночная молитва
+    'imsak': 'İmsak ------',      # Утренняя молитва до восхода
+    'sunrise': 'Günəş ------',    # Восход
+    'dhuhr': 'Günorta ----',      # Полуденная молитва
+    'asr': 'İkindi -----',        # Послеполуденная молитва
+    'maghrib': 'Axşam ------',    # Вечерняя молитва
+    'isha': 'Gecə -------'        # Ночная молитва
+}
 
 def create_prayer_times_layout(self, base_font_size):
 
@@ -11,15 +28,15 @@ def create_prayer_times_layout(self, base_font_size):
         padding=(base_font_size * 0.15, 0)   # Отступы по краям layout
     )
 
+    # Строки таблицы - ось времен движка расчета в ее порядке
+    today_times = self.get_today_prayer_times()
     prayer_times = [
-        ('Təhəccüd ---', '00:30'),   # Полуночная молитва
-        ('İmsak ------', '05:30'),   # Утренняя молитва до восхода
-        ('Günəş ------', '05:30'),   # Восход
-        ('Günorta ----', '13:00'),   # Полуденная молитва
-        ('İkindi -----', '15:00'),   # Послеполуденная молитва
-        ('Axşam ------', '16:30'),   # Вечерняя молитва
-        ('Gecə -------', '20:30')    # Ночная молитва
+        (PRAYER_NAMES[prayer], format_minutes(minutes))
+        for prayer, minutes in zip(PRAYER_KEYS, today_times)
     ]
+    
+    # Пары Label (название, время) для подсветки текущего намаза
+    prayer_times_layout.prayer_rows = []
 
     for prayer_name, prayer_time in prayer_times:
         # Label для названия молитвы
@@ -49,6 +66,7 @@ def create_prayer_times_layout(self, base_font_size):
         # Добавляем Labels в layout
         prayer_times_layout.add_widget(prayer_name_label)
         prayer_times_layout.add_widget(prayer_time_label)
+        prayer_times_layout.prayer_rows.append((prayer_name_label, prayer_time_label))
 
     return prayer_times_layout
 
@@ -104,4 +122,74 @@ def create_next_time_layout(self, base_font_size):
     nex_time_layout.add_widget(next_time_numbers_label)
     nex_time_layout.add_widget(next_time_name_2_label)
     
+    # Ссылка на Label с цифрами для обратного отсчета
+    nex_time_layout.numbers_label = next_time_numbers_label
+    nex_time_layout.name_labels = (next_time_name_1_label, next_time_name_2_label)
+    
     return nex_time_layout
+
+def resize_prayer_times_layout(prayer_times_layout, base_font_size):
+    """
+    Обновляет размеры таблицы времен без пересоздания Label
+    """
+    prayer_times_layout.height = base_font_size * 4.0
+    prayer_times_layout.padding = (base_font_size * 0.15, 0)
+    for prayer_name_label, prayer_time_label in prayer_times_layout.prayer_rows:
+        prayer_name_label.font_size = base_font_size * 0.4
+        prayer_time_label.font_size = base_font_size * 0.45
+
+def resize_next_time_layout(nex_time_layout, base_font_size):
+    """
+    Обновляет размеры layout следующего времени без пересоздания Label
+    """
+    nex_time_layout.height = base_font_size * 0.7
+    nex_time_layout.numbers_label.font_size = base_font_size * 0.55
+    for name_label in nex_time_layout.name_labels:
+        name_label.font_size = base_font_size * 0.2
+
+class NextPrayerCountdown:
+    """
+    Обратный отсчет до следующего намаза и подсветка текущего
+    
+    Времена в кэше округлены до минуты, поэтому отображаемое значение
+    меняется только на границе минуты: отсчет подписан на минутные тики
+    TickService и перерисовывается ровно в момент смены, без опроса.
+    """
+    def __init__(self, app, numbers_label, prayer_times_layout, lifecycle):
+        self.app = app
+        self.numbers_label = numbers_label
+        self.prayer_rows = prayer_times_layout.prayer_rows
+        self.schedule = None
+        self.current_column = None
+        self.update(self.app.local_now().replace(second=0, microsecond=0))
+        lifecycle.subscribe(self.app.tick_service, self.update, 'minute')
+
+    def update(self, moment):
+        """Перерисовывает отсчет на момент минутного тика"""
+        now = moment.timestamp()
+        if self.schedule is None or now >= self.schedule.valid_until:
+            self.load_day(moment.date())
+        
+        minutes, _ = self.schedule.countdown(now)
+        self.numbers_label.text = format_countdown(minutes)
+        self.highlight(self.schedule.current_column(now))
+
+    def load_day(self, today):
+        """Загружает времена на сегодня и завтра и обновляет таблицу"""
+        today_times = self.app.prayer_cache.get(today)
+        tomorrow_times = self.app.prayer_cache.get(today + timedelta(days=1))
+        self.schedule = PrayerSchedule(today, today_times, tomorrow_times, self.app.zone)
+        
+        for (_, prayer_time_label), minutes in zip(self.prayer_rows, today_times):
+            prayer_time_label.text = format_minutes(minutes)
+
+    def highlight(self, column):
+        """Подсвечивает строку текущего намаза цветом часов"""
+        if column == self.current_column:
+            return
+        for index, row in enumerate(self.prayer_rows):
+            color = self.app.title_label.color if index == column else DEFAULT_ROW_COLOR
+            for label in row:
+                label.color = color
+        self.current_column = column
+
@@ -0,0 +1,79 @@
+"""
+График высоты солнца за сегодня.
+
+Кривая - одна инструкция Line с вершинами из logic.sun_graph, горизонт
+и отметки времен намаза - один Mesh. Оба буфера вершин пересобираются
+только в полночь и при изменении размера виджета; на минутном тике
+сдвигается лишь точка "сейчас" (позиция одного Ellipse).
+"""
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Ellipse, Line, Mesh
+from kivy.metrics import dp
+from logic.sun_graph import GraphScale, altitude_curve, curve_points, mark_vertices, marker_point
+
+# Цвета кривой и отметок
+CURVE_COLOR = (1, 0.8, 0.2, 1)
+MARKS_COLOR = (1, 1, 1, 0.4)
+
+# Диаметр точки "сейчас"
+MARKER_SIZE = dp(8)
+
+class SunGraph(Widget):
+    """
+    Кривая высоты солнца с отметками времен намаза и точкой "сейчас"
+
+    Args:
+        app: Приложение (local_now, zone, prayer_cache, tick_service, title_label)
+        lifecycle (Lifecycle): Владелец привязок и подписок макета
+    """
+
+    def __init__(self, app, lifecycle, **kwargs):
+        super().__init__(**kwargs)
+        self.app = app
+        self.curve = None
+        self.times = None
+        self.scale = None
+        self.minute = 0.0
+
+        with self.canvas:
+            Color(*MARKS_COLOR)
+            self._marks = Mesh(mode='lines')
+            Color(*CURVE_COLOR)
+            self._curve = Line(width=dp(1.5))
+            self._marker_color = Color(*app.title_label.color)
+            self._marker = Ellipse(size=(MARKER_SIZE, MARKER_SIZE))
+
+        self.load_day(app.local_now())
+        lifecycle.bind(self, 'pos', self._layout)
+        lifecycle.bind(self, 'size', self._layout)
+        lifecycle.subscribe(app.tick_service, self.load_day, 'day')
+        lifecycle.subscribe(app.tick_service, self.move_marker, 'minute')
+
+    def load_day(self, moment):
+        """Пересчитывает кривую и времена намаза на дату момента (в полночь)"""
+        settings = self.app.settings_db.get_calculation_settings()
+        self.curve = altitude_curve(
+            moment.date(), settings['latitude'], settings['longitude'], self.app.zone
+        )
+        self.times = self.app.prayer_cache.get(moment.date())
+        self._layout()
+        self.move_marker(moment)
+
+    def _layout(self, *args):
+        """Переводит кривую и отметки в вершины для текущих pos и size"""
+        self.scale = GraphScale(self.curve, self.x, self.y, self.width, self.height)
+        self._curve.points = curve_points(self.curve, self.scale).tolist()
+        vertices = mark_vertices(self.curve, self.times, self.scale)
+        self._marks.vertices = vertices.tolist()
+        self._marks.indices = list(range(len(vertices) // 4))
+        self._place_marker()
+
+    def move_marker(self, moment):
+        """Сдвигает точку "сейчас" на минутном тике"""
+        self.minute = moment.hour * 60 + moment.minute
+        self._marker_color.rgba = self.app.title_label.color
+        self._place_marker()
+
+    def _place_marker(self):
+        x, y = marker_point(self.curve, self.minute, self.scale)
+        self._marker.pos = (x - MARKER_SIZE / 2, y - MARKER_SIZE / 2)